@@ -1,21 +1,77 @@
+import os
+import time
+import threading
+import joblib
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier, HistGradientBoostingClassifier
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.preprocessing import MinMaxScaler
 import ta
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 from sklearn.metrics import accuracy_score, precision_score, recall_score
 from utils import calculate_timeframe_data
+from panel_indicators import build_panel, rsi, macd_diff, ema, rolling_mean, rolling_std, pct_change
+from ohlcv_store import DATA_DIR
+
+# Modèles disponibles pour AIPredictor : nom -> fabrique d'estimateur
+MODEL_BACKENDS = {
+    'random_forest': lambda: RandomForestClassifier(n_estimators=100),
+    'shallow_forest': lambda: RandomForestClassifier(n_estimators=50, max_depth=4, n_jobs=-1),
+    'logistic': lambda: LogisticRegression(max_iter=500),
+    'hist_gb': lambda: HistGradientBoostingClassifier(max_iter=100, max_depth=3)
+}
+DEFAULT_BACKEND = 'random_forest'
+
+
+# Backend d'apprentissage en ligne (OnlineAIPredictor), un modèle par symbole
+ONLINE_BACKEND = 'online'
+
+
+def make_model(backend=DEFAULT_BACKEND):
+    """Estimateur non entraîné du backend demandé"""
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"Backend inconnu: {backend} (disponibles : {', '.join(MODEL_BACKENDS)})")
+    return MODEL_BACKENDS[backend]()
+
+
+def create_predictor(backend=DEFAULT_BACKEND, registry=None, feature_store=None):
+    """
+    Prédicteur de l'application pour un backend de MODEL_BACKENDS,
+    ou ONLINE_BACKEND pour l'apprentissage en ligne
+    """
+    if backend == ONLINE_BACKEND:
+        return OnlineAIPredictor()
+    return AIPredictor(registry=registry, feature_store=feature_store, backend=backend)
+
 
 class AIPredictor:
-    def __init__(self):
-        self.model = RandomForestClassifier(n_estimators=100)
+    # À incrémenter à chaque modification de compute_features
+    FEATURE_SET_VERSION = 2
+    # Clé du modèle commun à tous les symboles dans le registre
+    UNIVERSE_SYMBOL = 'UNIVERSE'
+
+    def __init__(self, registry=None, feature_store=None, backend=DEFAULT_BACKEND):
+        self.backend = backend
+        self.model = make_model(backend)
         self.scaler = MinMaxScaler()
+        # Les modèles de chaque backend sont rangés séparément dans le registre
+        self.model_version = (self.FEATURE_SET_VERSION if backend == DEFAULT_BACKEND
+                              else f"{self.FEATURE_SET_VERSION}{backend}")
+        self.registry = registry
+        self.feature_store = feature_store
         
     def prepare_features(self, df):
         """Prépare les features pour l'IA"""
-        features = pd.DataFrame()
+        return self.scaler.fit_transform(self.compute_features(df).dropna())
+
+    @staticmethod
+    def compute_features(df):
+        """Calcule les features brutes (non normalisées), alignées sur df"""
+        features = pd.DataFrame(index=df.index)
         
         features['rsi'] = ta.momentum.rsi(df['close'])
         features['macd'] = ta.trend.macd_diff(df['close'])
@@ -25,11 +81,151 @@ class AIPredictor:
         features['ema9_trend'] = (df['close'] - ta.trend.ema_indicator(df['close'], window=9)) / df['close']
         features['ema20_trend'] = (df['close'] - ta.trend.ema_indicator(df['close'], window=20)) / df['close']
         
-        features['volatility'] = df['close'].rolling(window=20).std() / df['close'].mean()
+        # Normalisée par la moyenne glissante : ne dépend pas de la fenêtre fournie
+        features['volatility'] = df['close'].rolling(window=20).std() / df['close'].rolling(window=20).mean()
         
-        return self.scaler.fit_transform(features.dropna())
+        return features
         
-    def predict_movement(self, df):
+    @staticmethod
+    def compute_panel_features(panel):
+        """
+        Version vectorisée de compute_features pour un panel (symboles × bougies)
+        Retourne un tableau (symboles × bougies × features)
+        """
+        close, volume = panel['close'], panel['volume']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            features = [
+                rsi(close),
+                macd_diff(close),
+                pct_change(volume),
+                pct_change(close),
+                (close - ema(close, 9)) / close,
+                (close - ema(close, 20)) / close,
+                rolling_std(close, 20) / rolling_mean(close, 20)
+            ]
+        return np.stack(features, axis=-1)
+
+    def predict_batch(self, frames, timeframe='1h'):
+        """
+        Probabilités de hausse pour plusieurs symboles en un seul predict_proba
+        frames : dict {symbole: DataFrame OHLCV}
+        Un modèle commun, entraîné sur l'historique de tous les symboles,
+        est réutilisé depuis le registre tant qu'il n'est pas périmé
+        Avec un stockage de features, les lignes d'entraînement sont lues dans
+        le stockage : seules les nouvelles bougies clôturées sont calculées
+        """
+        try:
+            frames = {s: df for s, df in frames.items() if df is not None and len(df) > 1}
+            if not frames:
+                return {}
+
+            if self.feature_store is not None:
+                symbols, X, y, last = self._stored_batch(frames, timeframe)
+            else:
+                symbols, X, y, last = self._panel_batch(frames)
+            if not symbols:
+                return {}
+
+            window_end = max(int(frames[s]['timestamp'].iloc[-1].value // 10**6) for s in symbols)
+            model, scaler = self._universe_model(X, y, timeframe, window_end)
+
+            valid = np.isfinite(last).all(axis=1)
+            probabilities = np.zeros(len(symbols))
+            if valid.any() and 1 in model.classes_:
+                start = time.perf_counter()
+                proba = model.predict_proba(scaler.transform(last[valid]))
+                if self.registry is not None:
+                    self.registry.record('predict', time.perf_counter() - start)
+                probabilities[valid] = proba[:, list(model.classes_).index(1)]
+
+            return dict(zip(symbols, probabilities.tolist()))
+
+        except Exception as e:
+            print(f"Erreur de prédiction groupée: {str(e)}")
+            return {}
+
+    def _stored_batch(self, frames, timeframe):
+        """
+        Lignes d'entraînement (stockage de features) et ligne de la bougie
+        en cours de chaque symbole ; ligne de NaN si elle est incomplète
+        Le stockage n'est mis à jour que pour les symboles en retard d'une
+        bougie clôturée ; les lignes des bougies en cours sont calculées en
+        une passe sur le panel des historiques récents
+        """
+        X, y = [], []
+        for symbol, df in frames.items():
+            last_closed = int(df['timestamp'].iloc[-2].value // 10**6)
+            stored = self.feature_store.last_timestamp(symbol, timeframe)
+            if stored is None or stored < last_closed:
+                self.feature_store.update(symbol, timeframe, df)
+            start = int(df['timestamp'].iloc[0].value // 10**6)
+            symbol_X, symbol_y = self.feature_store.training_arrays(symbol, timeframe, start=start)
+            if len(symbol_X):
+                X.append(symbol_X)
+                y.append(symbol_y)
+        if not X:
+            return [], None, None, None
+
+        length = min(self.feature_store.warmup + 1, min(len(df) for df in frames.values()))
+        symbols, panel = build_panel(frames, length)
+        last = self.compute_panel_features(panel)[:, -1, :]
+        return symbols, np.concatenate(X), np.concatenate(y), last
+
+    def _panel_batch(self, frames):
+        """Mêmes lignes calculées en une passe sur le panel, sans stockage"""
+        symbols, panel = build_panel(frames)
+        if not symbols:
+            return [], None, None, None
+        features = self.compute_panel_features(panel)
+        close = panel['close']
+        # L'avant-dernière bougie n'est pas apprise : son label dépend de la bougie en cours
+        X = features[:, :-2, :].reshape(-1, features.shape[-1])
+        y = (close[:, 1:-1] > close[:, :-2]).astype(int).reshape(-1)
+        return symbols, X, y, features[:, -1, :]
+
+    def _universe_model(self, X, y, timeframe, window_end):
+        """Modèle commun : depuis le registre, sinon entraîné sur toutes les lignes"""
+        version = self.model_version
+        if self.registry is not None:
+            cached = self.registry.get(self.UNIVERSE_SYMBOL, timeframe, version, window_end)
+            if cached is not None:
+                return cached
+
+        rows = np.isfinite(X).all(axis=1)
+
+        start = time.perf_counter()
+        scaler = MinMaxScaler()
+        model = clone(self.model).fit(scaler.fit_transform(X[rows]), y[rows])
+        if self.registry is not None:
+            self.registry.record('fit', time.perf_counter() - start)
+            self.registry.put(self.UNIVERSE_SYMBOL, timeframe, version, window_end, model, scaler)
+        return model, scaler
+
+    def training_data(self, df, since=None):
+        """
+        Features brutes et labels alignés (hausse de la bougie suivante)
+        La dernière ligne (bougie en cours) est renvoyée à part ; l'avant-
+        dernière n'est pas apprise, son label dépendant de la bougie en cours
+        since : ne garder que les lignes d'entraînement postérieures
+        """
+        features = self.compute_features(df)
+        labels = (df['close'].shift(-1) > df['close']).astype(int).to_numpy()
+        rows = np.flatnonzero(features.notna().all(axis=1).to_numpy())
+        X = features.to_numpy()[rows]
+        last_row = X[-1:] if len(rows) and rows[-1] == len(df) - 1 else X[:0]
+        train = rows < len(df) - 2
+        if since is not None:
+            train &= df['timestamp'].to_numpy()[rows] > np.datetime64(since)
+        return X[train], labels[rows[train]], last_row
+
+    def predict_movement(self, df, symbol=None, timeframe='1h'):
+        """
+        Probabilité de hausse sur la prochaine bougie
+        Avec un symbole et un registre, le modèle entraîné est réutilisé
+        tant qu'il n'est pas périmé
+        """
+        if symbol and self.registry is not None:
+            return self._predict_with_registry(df, symbol, timeframe)
         try:
             features = self.prepare_features(df)
             if len(features) < 2:
@@ -51,6 +247,188 @@ class AIPredictor:
             print(f"Erreur de prédiction: {str(e)}")
             return {'probability': 0, 'confidence': 0}
 
+    def stored_training_data(self, df, symbol, timeframe):
+        """
+        Même contrat que training_data, à partir du stockage de features :
+        seules les bougies clôturées absentes du stockage sont calculées
+        """
+        self.feature_store.update(symbol, timeframe, df)
+        start = int(df['timestamp'].iloc[0].value // 10**6)
+        X, y = self.feature_store.training_arrays(symbol, timeframe, start=start)
+        # Bougie en cours : calculée à partir de l'historique récent uniquement
+        tail = df.iloc[-(self.feature_store.warmup + 1):]
+        last_row = self.compute_features(tail).to_numpy()[-1:]
+        if not np.isfinite(last_row).all():
+            last_row = last_row[:0]
+        return X, y, last_row
+
+    def _predict_with_registry(self, df, symbol, timeframe):
+        try:
+            if self.feature_store is not None:
+                X, y, last_row = self.stored_training_data(df, symbol, timeframe)
+            else:
+                X, y, last_row = self.training_data(df)
+            if len(last_row) == 0 or len(X) < 2:
+                return {'probability': 0, 'confidence': 0}
+
+            window_end = int(df['timestamp'].iloc[-1].value // 10**6)
+            version = self.model_version
+            cached = self.registry.get(symbol, timeframe, version, window_end)
+            if cached is None:
+                start = time.perf_counter()
+                scaler = MinMaxScaler()
+                model = clone(self.model).fit(scaler.fit_transform(X), y)
+                self.registry.record('fit', time.perf_counter() - start)
+                self.registry.put(symbol, timeframe, version, window_end, model, scaler)
+            else:
+                model, scaler = cached
+
+            start = time.perf_counter()
+            probability = model.predict_proba(scaler.transform(last_row))
+            self.registry.record('predict', time.perf_counter() - start)
+
+            # Un modèle entraîné sur une seule classe n'a qu'une colonne
+            up = probability[0][list(model.classes_).index(1)] if 1 in model.classes_ else 0.0
+            return {
+                'probability': up,
+                'confidence': max(probability[0])
+            }
+
+        except Exception as e:
+            print(f"Erreur de prédiction: {str(e)}")
+            return {'probability': 0, 'confidence': 0}
+
+class RunningScaler:
+    """
+    Normalisation incrémentale (moyenne et variance glissantes de Welford)
+    Remplace MinMaxScaler.fit_transform pour l'apprentissage en ligne
+    """
+    def __init__(self):
+        self.count = 0
+        self.mean = None
+        self._m2 = None
+
+    def partial_fit(self, X):
+        for x in np.asarray(X, dtype=float):
+            if self.mean is None:
+                self.mean = np.zeros_like(x)
+                self._m2 = np.zeros_like(x)
+            self.count += 1
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (x - self.mean)
+        return self
+
+    def transform(self, X):
+        std = np.sqrt(self._m2 / max(self.count - 1, 1))
+        return (np.asarray(X, dtype=float) - self.mean) / np.where(std > 0, std, 1.0)
+
+
+class OnlineAIPredictor(AIPredictor):
+    """
+    Variante d'AIPredictor en apprentissage en ligne (SGDClassifier.partial_fit)
+    Chaque bougie clôturée met à jour le modèle du symbole en place ;
+    l'état est sauvegardé sur disque pour survivre aux redémarrages
+    """
+    def __init__(self, directory=None):
+        super().__init__()
+        self.directory = directory or os.path.join(DATA_DIR, 'online_models')
+        os.makedirs(self.directory, exist_ok=True)
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _path(self, symbol, timeframe):
+        name = f"{symbol.replace('/', '-').replace(':', '-')}_{timeframe}_v{self.FEATURE_SET_VERSION}.joblib"
+        return os.path.join(self.directory, name)
+
+    def _state(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._states:
+            state = None
+            path = self._path(symbol, timeframe)
+            if os.path.exists(path):
+                try:
+                    state = joblib.load(path)
+                except Exception as e:
+                    print(f"Checkpoint illisible {path}: {str(e)}")
+            self._states[key] = state or {
+                'model': SGDClassifier(loss='log_loss', learning_rate='constant',
+                                       eta0=0.01, random_state=0),
+                'scaler': RunningScaler(),
+                'last_timestamp': None
+            }
+        return self._states[key]
+
+    def update(self, df, symbol, timeframe='1h'):
+        """
+        Apprend les bougies clôturées depuis la dernière mise à jour
+        Retourne le nombre de bougies apprises
+        """
+        with self._lock:
+            state = self._state(symbol, timeframe)
+            X, y, _ = self.training_data(df, since=state['last_timestamp'])
+            if len(X) == 0:
+                return 0
+
+            state['scaler'].partial_fit(X)
+            state['model'].partial_fit(state['scaler'].transform(X), y, classes=[0, 1])
+            # Horodatage de la dernière bougie apprise : la dernière dont la
+            # bougie suivante est clôturée (antépénultième de df)
+            state['last_timestamp'] = df['timestamp'].iloc[-3]
+            try:
+                joblib.dump(state, self._path(symbol, timeframe))
+            except OSError as e:
+                print(f"Sauvegarde du checkpoint impossible: {str(e)}")
+            return len(X)
+
+    def _online_probabilities(self, df, symbol, timeframe):
+        """
+        Met à jour le modèle du symbole puis prédit la prochaine bougie
+        Retourne [P(baisse), P(hausse)], None tant que le modèle n'a rien appris
+        """
+        self.update(df, symbol, timeframe)
+        state = self._state(symbol, timeframe)
+        _, _, last_row = self.training_data(df)
+        if len(last_row) == 0 or state['last_timestamp'] is None:
+            return None
+        return state['model'].predict_proba(state['scaler'].transform(last_row))[0]
+
+    def predict_movement(self, df, symbol=None, timeframe='1h'):
+        """Met à jour le modèle du symbole puis prédit la prochaine bougie"""
+        if not symbol:
+            return super().predict_movement(df)
+        try:
+            probability = self._online_probabilities(df, symbol, timeframe)
+            if probability is None:
+                return {'probability': 0, 'confidence': 0}
+            return {
+                'probability': probability[1],
+                'confidence': max(probability)
+            }
+
+        except Exception as e:
+            print(f"Erreur de prédiction en ligne: {str(e)}")
+            return {'probability': 0, 'confidence': 0}
+
+    def predict_batch(self, frames, timeframe='1h'):
+        """
+        Probabilités de hausse de plusieurs symboles, chacun avec son modèle
+        en ligne ; les symboles dont le modèle n'a rien appris sont omis
+        """
+        probabilities = {}
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            try:
+                probability = self._online_probabilities(df, symbol, timeframe)
+            except Exception as e:
+                print(f"Erreur de prédiction en ligne pour {symbol}: {str(e)}")
+                continue
+            if probability is not None:
+                probabilities[symbol] = float(probability[1])
+        return probabilities
+
+
 class AITester:
     def __init__(self, exchange, ai_predictor):
         self.exchange = exchange
@@ -90,6 +468,63 @@ class AITester:
         except Exception as e:
             print(f"Erreur backtest: {str(e)}")
             return None
+
+    def walk_forward_backtest(self, symbol, days=30, retrain_every=24,
+                              train_window=None, min_train=48, n_jobs=-1):
+        """
+        Backtest walk-forward : features calculées une seule fois,
+        modèle réentraîné toutes les retrain_every bougies.
+        train_window=None : fenêtre d'entraînement croissante,
+        sinon fenêtre glissante de train_window bougies.
+        Les folds sont évalués en parallèle.
+        """
+        try:
+            start = time.perf_counter()
+            df = calculate_timeframe_data(self.exchange, symbol, '1h', days * 24)
+            if df is None:
+                return None
+
+            features = self.ai_predictor.compute_features(df)
+            labels = (df['close'].shift(-1) > df['close']).astype(int)
+            # Lignes exploitables : features complètes et bougie suivante connue
+            rows = np.flatnonzero(features.notna().all(axis=1).to_numpy())
+            rows = rows[rows < len(df) - 1]
+            X = features.to_numpy()[rows]
+            y = labels.to_numpy()[rows]
+
+            folds = []
+            for fold_start in range(min_train, len(rows), retrain_every):
+                train_start = 0 if train_window is None else max(0, fold_start - train_window)
+                folds.append((train_start, fold_start, min(fold_start + retrain_every, len(rows))))
+            if not folds:
+                return None
+
+            fold_results = Parallel(n_jobs=n_jobs)(
+                delayed(_run_walk_forward_fold)(self.ai_predictor.model, X, y, *fold)
+                for fold in folds
+            )
+
+            predictions = np.concatenate([r['predictions'] for r in fold_results])
+            test_rows = rows[folds[0][1]:folds[-1][2]]
+            actual = y[folds[0][1]:folds[-1][2]].astype(bool)
+
+            return {
+                'metrics': {
+                    'accuracy': accuracy_score(actual, predictions),
+                    'precision': precision_score(actual, predictions, zero_division=0),
+                    'recall': recall_score(actual, predictions, zero_division=0)
+                },
+                'folds': [{k: v for k, v in r.items() if k != 'predictions'} for r in fold_results],
+                'predictions': predictions.tolist(),
+                'actual': actual.tolist(),
+                'dates': df['timestamp'].iloc[test_rows].tolist(),
+                'fit_count': len(fold_results),
+                'runtime': time.perf_counter() - start
+            }
+
+        except Exception as e:
+            print(f"Erreur backtest walk-forward: {str(e)}")
+            return None
             
     def visualize_results(self, results, symbol):
         if not results:
@@ -127,3 +562,19 @@ class AITester:
         
         return fig
 
+
+def _run_walk_forward_fold(model, X, y, train_start, test_start, test_end):
+    """Entraîne un modèle sur un fold et évalue la période de test suivante"""
+    scaler = MinMaxScaler()
+    estimator = clone(model)
+    estimator.fit(scaler.fit_transform(X[train_start:test_start]), y[train_start:test_start])
+    predictions = estimator.predict(scaler.transform(X[test_start:test_end])).astype(bool)
+    actual = y[test_start:test_end].astype(bool)
+    return {
+        'train_size': test_start - train_start,
+        'test_size': test_end - test_start,
+        'accuracy': accuracy_score(actual, predictions),
+        'precision': precision_score(actual, predictions, zero_division=0),
+        'recall': recall_score(actual, predictions, zero_division=0),
+        'predictions': predictions
+    }
@@ -0,0 +1,102 @@
+# analysis_benchmark.py
+"""
+Mesure du coût par appel des méthodes de TechnicalAnalysis / SignalGenerator
+
+Usage :
+    python analysis_benchmark.py --candles 100 --frames 200
+
+Pour chaque méthode : durée, mémoire allouée au pic (tracemalloc), blocs
+mémoire conservés après l'appel et modification éventuelle du DataFrame.
+"froid" : premier appel sur un DataFrame ; "chaud" : appels suivants,
+servis par le contexte d'indicateurs.
+"""
+import sys
+import time
+import argparse
+import warnings
+import tracemalloc
+import numpy as np
+import pandas as pd
+from technical_analysis import TechnicalAnalysis, SignalGenerator
+
+METHODS = {
+    'calculate_rsi': lambda df: TechnicalAnalysis.calculate_rsi(df),
+    'calculate_support_resistance': lambda df: TechnicalAnalysis.calculate_support_resistance(df),
+    'calculate_volume_levels': lambda df: TechnicalAnalysis.calculate_volume_levels(df),
+    'calculate_momentum_score': lambda df: TechnicalAnalysis.calculate_momentum_score(df),
+    'get_market_sentiment': lambda df: TechnicalAnalysis.get_market_sentiment(df),
+    'analyze_volume_profile': lambda df: TechnicalAnalysis.analyze_volume_profile(df),
+    'calculate_opportunity_score':
+        lambda df: SignalGenerator(df, df['close'].iloc[-1]).calculate_opportunity_score(),
+    'generate_trading_signals':
+        lambda df: SignalGenerator(df, df['close'].iloc[-1]).generate_trading_signals()
+}
+
+
+def synthetic_frame(candles, rng):
+    """Série OHLCV aléatoire (marche aléatoire géométrique)"""
+    close = np.exp(np.cumsum(rng.normal(0, 0.01, candles)))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=candles, freq='h'),
+        'open': open_,
+        'high': np.maximum(open_, close) * 1.005,
+        'low': np.minimum(open_, close) * 0.995,
+        'close': close,
+        'volume': rng.random(candles) * 1000
+    })
+
+
+def measure_call(method, df):
+    """Durée (s), pic alloué (octets), blocs conservés et modification du DataFrame"""
+    columns = list(df.columns)
+    tracemalloc.reset_peak()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    method(df)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - start_memory
+    return elapsed, peak, sys.getallocatedblocks() - blocks, list(df.columns) != columns
+
+
+def benchmark(candles=100, frames=200, seed=0):
+    """Statistiques moyennes par méthode, à froid et à chaud"""
+    rng = np.random.default_rng(seed)
+    results = []
+    tracemalloc.start()
+    try:
+        for name, method in METHODS.items():
+            data = [synthetic_frame(candles, rng) for _ in range(frames)]
+            for phase in ('froid', 'chaud'):
+                calls = [measure_call(method, df) for df in data]
+                elapsed, peak, blocks, mutated = zip(*calls)
+                results.append({
+                    'method': name,
+                    'phase': phase,
+                    'time_us': np.mean(elapsed) * 1e6,
+                    'peak_kb': np.mean(peak) / 1024,
+                    'retained_blocks': np.mean(blocks),
+                    'mutates_frame': any(mutated)
+                })
+    finally:
+        tracemalloc.stop()
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût par appel de TechnicalAnalysis")
+    parser.add_argument('--candles', type=int, default=100, help="Bougies par DataFrame")
+    parser.add_argument('--frames', type=int, default=200, help="DataFrames par méthode")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Divisions par zéro de l'ADX (ta) sur les séries synthétiques
+    warnings.simplefilter('ignore', RuntimeWarning)
+    results = benchmark(args.candles, args.frames, args.seed)
+    with pd.option_context('display.width', 160, 'display.float_format', '{:.1f}'.format):
+        print(results.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,34 +1,65 @@
 # app.py
+import time
+# Début du run, pris avant les imports lourds (ccxt, pandas, interface...)
+_SCRIPT_START = time.perf_counter()
+import os
 import streamlit as st
 import ccxt
 from datetime import datetime
 from utils import SessionState, format_number, get_exchange
-from technical_analysis import TechnicalAnalysis
+from technical_analysis import TechnicalAnalysis, IndicatorContext
 from portfolio_management import PortfolioManager
 from interface import (LiveAnalysisPage, PortfolioPage, OpportunitiesPage, 
                       HistoricalAnalysisPage, TopPerformancePage, MicroTradingPage, GuidePage)
-from ai_predictor import AIPredictor
+from candle_cache import get_candle_cache
 
 class CryptoAnalyzerApp:
     def __init__(self):
         self.exchange = get_exchange()
         self.ta = TechnicalAnalysis()
         self.portfolio = PortfolioManager(self.exchange)
-        self.ai = AIPredictor()
+        self._ai = None
         
-        self.pages = {
-            "Analyse en Direct": LiveAnalysisPage(self.exchange, self.ta, self.portfolio),
-            "Trading Micro-Budget": MicroTradingPage(self.exchange, self.portfolio, self.ai),
-            "Portefeuille": PortfolioPage(self.portfolio),
-            "Top Performances": TopPerformancePage(self.exchange, self.ta),
-            "Opportunités Court Terme": OpportunitiesPage(self.exchange, self.ta),
-            "Analyse Historique": HistoricalAnalysisPage(self.exchange, self.ta),
-            "Guide & Explications": GuidePage()
+        # Pages construites à la première navigation (voir get_page)
+        self._pages = {}
+        self.page_factories = {
+            "Analyse en Direct": lambda: LiveAnalysisPage(self.exchange, self.ta, self.portfolio),
+            "Trading Micro-Budget": lambda: MicroTradingPage(self.exchange, self.portfolio, self.ai),
+            "Portefeuille": lambda: PortfolioPage(self.portfolio),
+            "Top Performances": lambda: TopPerformancePage(self.exchange, self.ta),
+            "Opportunités Court Terme": lambda: OpportunitiesPage(self.exchange, self.ta),
+            "Analyse Historique": lambda: HistoricalAnalysisPage(self.exchange, self.ta),
+            "Guide & Explications": lambda: GuidePage()
         }
 
+    @property
+    def ai(self):
+        """
+        Prédicteur IA créé au premier usage
+        scikit-learn n'est importé que par les pages qui en ont besoin
+        """
+        if self._ai is None:
+            from ai_predictor import AIPredictor, DEFAULT_BACKEND, create_predictor
+            from feature_store import get_feature_store
+            from model_registry import get_model_registry
+            self._ai = create_predictor(
+                # Backend choisi par déploiement selon le budget de latence (voir
+                # model_benchmark.py), ou 'online' pour l'apprentissage en ligne
+                backend=os.environ.get('AI_BACKEND', DEFAULT_BACKEND),
+                registry=get_model_registry(),
+                feature_store=get_feature_store(AIPredictor.compute_features, AIPredictor.FEATURE_SET_VERSION)
+            )
+        return self._ai
+
+    def get_page(self, page_name):
+        """Retourne la page, construite lors de sa première ouverture"""
+        if page_name not in self._pages:
+            self._pages[page_name] = self.page_factories[page_name]()
+        return self._pages[page_name]
+
     def run(self):
         st.sidebar.title("Navigation")
-        page_name = st.sidebar.selectbox("Choisir une page", list(self.pages.keys()))
+        page_name = st.sidebar.selectbox("Choisir une page", list(self.page_factories.keys()))
         
         if st.session_state.portfolio['capital'] > 0:
             st.sidebar.markdown("---")
@@ -40,10 +71,34 @@ class CryptoAnalyzerApp:
             )
             
         try:
-            self.pages[page_name].render()
+            self.get_page(page_name).render()
         except Exception as e:
             st.error(f"Erreur lors du chargement de la page: {str(e)}")
 
+        # Temps passé à attendre le limiteur de requêtes
+        stats = self.exchange.throttle_stats()
+        st.sidebar.caption(
+            f"⏱️ API : {stats['requests']} requêtes, "
+            f"{stats['throttled_seconds']:.1f}s d'attente rate limit"
+        )
+        # Requêtes de bougies évitées grâce au cache
+        cache_stats = get_candle_cache().stats()
+        st.sidebar.caption(
+            f"🗄️ Cache bougies : {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%}), {cache_stats['refreshes']} bougies en cours rafraîchies"
+        )
+        # Indicateurs partagés entre les méthodes d'analyse
+        indicator_stats = IndicatorContext.stats()
+        st.sidebar.caption(
+            f"🧮 Indicateurs : {indicator_stats['computed']} calculés, "
+            f"{indicator_stats['avoided']} recalculs évités"
+        )
+
+@st.cache_resource
+def _startup_report():
+    """État du journal de démarrage (partagé entre les reruns du processus)"""
+    return {'reported': False}
+
 def main():
     try:
         # Configuration des styles CSS
@@ -52,6 +107,8 @@ def main():
             page_icon="📊",
             layout="wide"
         )
+        # Après set_page_config, qui doit rester la première commande Streamlit
+        startup = _startup_report()
         
         st.markdown("""
             <style>
@@ -74,6 +131,12 @@ def main():
         app = CryptoAnalyzerApp()
         app.run()
 
+        # Temps jusqu'au premier rendu, journalisé une fois par processus
+        if not startup['reported']:
+            startup['reported'] = True
+            print(f"Premier rendu en {time.perf_counter() - _SCRIPT_START:.2f}s "
+                  f"({len(app.exchange.markets or {})} marchés chargés)")
+
     except Exception as e:
         st.error(f"""
         ⚠️ Une erreur s'est produite lors du démarrage de l'application:
@@ -0,0 +1,125 @@
+# candle_cache.py
+import time
+import threading
+from collections import OrderedDict
+import ccxt
+import pandas as pd
+
+# Les bougies hebdomadaires KuCoin démarrent le lundi, l'epoch Unix est un jeudi
+WEEK_OFFSET = 4 * 86400
+
+
+class CandleCache:
+    """
+    Cache mémoire des bougies indexé par (symbole, timeframe, limit)
+    Les bougies clôturées sont gardées jusqu'à la clôture de la bougie en
+    cours ; celle-ci est rafraîchie toutes les open_ttl secondes
+    Les DataFrames renvoyés sont partagés, sans copie : lecture seule
+    """
+    def __init__(self, max_entries=2048, close_delay=2, open_ttl=60):
+        self.max_entries = max_entries
+        self.close_delay = close_delay  # Laisse à l'exchange le temps de publier la bougie
+        self.open_ttl = open_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    @staticmethod
+    def next_close(timeframe, now=None):
+        """Horodatage (s) de la clôture de la bougie en cours"""
+        now = time.time() if now is None else now
+        duration = ccxt.Exchange.parse_timeframe(timeframe)
+        offset = WEEK_OFFSET if timeframe.endswith('w') else 0
+        return ((now - offset) // duration + 1) * duration + offset
+
+    def _entry(self, key):
+        """Entrée dont les bougies clôturées sont encore valides, None sinon"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def get(self, key):
+        """Retourne la série si sa bougie en cours est encore fraîche, None sinon"""
+        entry = self._entry(key)
+        fresh = entry is not None and entry[1] > time.time()
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry[2] if fresh else None
+
+    def put(self, key, df, timeframe):
+        """
+        Stocke une série : bougies clôturées jusqu'à la prochaine clôture,
+        bougie en cours pendant open_ttl secondes
+        """
+        closes_at = self.next_close(timeframe) + self.close_delay
+        refresh_at = min(closes_at, time.time() + self.open_ttl)
+        with self._lock:
+            self._entries[key] = (closes_at, refresh_at, df)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _merge_recent(df, recent, limit):
+        """Remplace la fin de df par les bougies récentes (bougie en cours comprise)"""
+        closed = df[df['timestamp'] < recent['timestamp'].iloc[0]]
+        return pd.concat([closed, recent], ignore_index=True).tail(limit).reset_index(drop=True)
+
+    def get_or_fetch(self, symbol, timeframe, limit, fetch, fetch_recent=None):
+        """
+        Retourne la série en cache ou l'obtient via fetch()
+        fetch_recent() : dernières bougies seulement, pour rafraîchir la
+        bougie en cours sans relire toute la série ; à défaut, fetch()
+        """
+        key = (symbol, timeframe, limit)
+        entry = self._entry(key)
+        if entry is not None and entry[1] > time.time():
+            with self._lock:
+                self.hits += 1
+            return entry[2]
+
+        df = None
+        if entry is not None and fetch_recent is not None:
+            recent = fetch_recent()
+            if recent is not None and not recent.empty:
+                df = self._merge_recent(entry[2], recent, limit)
+                with self._lock:
+                    self.refreshes += 1
+        if df is None:
+            with self._lock:
+                self.misses += 1
+            df = fetch()
+        if df is not None:
+            self.put(key, df, timeframe)
+        return df
+
+    def stats(self):
+        """Compteurs hit/miss du cache"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'hit_rate': self.hits / total if total else 0,
+                'entries': len(self._entries)
+            }
+
+
+_default_cache = CandleCache()
+
+
+def get_candle_cache():
+    """
+    Retourne le cache partagé par toute l'application
+    """
+    return _default_cache
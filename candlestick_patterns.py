@@ -0,0 +1,161 @@
+# candlestick_patterns.py
+import numpy as np
+from panel_indicators import build_panel, rolling_mean
+
+# Détection vectorisée des figures de chandeliers. Comme panel_indicators,
+# tout travaille sur des panels 2-D (symboles × bougies) : chaque figure est
+# évaluée sur toutes les bougies de tous les symboles en une seule passe.
+# Une série seule est traitée comme un panel d'une ligne.
+
+# Libellé et sens (1 haussier, -1 baissier, 0 indécision) de chaque figure
+PATTERNS = {
+    'doji': ("Doji", 0),
+    'hammer': ("Hammer", 1),
+    'inverted_hammer': ("Inverted Hammer", 1),
+    'hanging_man': ("Hanging Man", -1),
+    'shooting_star': ("Shooting Star", -1),
+    'bullish_engulfing': ("Bullish Engulfing", 1),
+    'bearish_engulfing': ("Bearish Engulfing", -1),
+    'bullish_harami': ("Bullish Harami", 1),
+    'bearish_harami': ("Bearish Harami", -1),
+    'piercing_line': ("Piercing Line", 1),
+    'dark_cloud_cover': ("Dark Cloud Cover", -1),
+    'morning_star': ("Morning Star", 1),
+    'evening_star': ("Evening Star", -1),
+    'three_white_soldiers': ("Three White Soldiers", 1),
+    'three_black_crows': ("Three Black Crows", -1)
+}
+
+# Bougies servant de référence pour la taille « normale » d'un corps
+BODY_WINDOW = 10
+# Bougies servant à déterminer la tendance qui précède une figure
+TREND_WINDOW = 5
+# Historique suffisant pour évaluer toutes les figures sur la dernière bougie
+# (corps moyen des BODY_WINDOW bougies précédant la première bougie d'une étoile)
+PATTERN_HISTORY = max(BODY_WINDOW + 3, TREND_WINDOW + 2)
+
+
+def _shift(values, periods=1):
+    """
+    Décale les bougies de periods vers la droite (NaN en tête)
+    Les booléens deviennent 1.0 / 0.0
+    """
+    out = np.full(values.shape, np.nan)
+    out[:, periods:] = values[:, :-periods]
+    return out
+
+
+def detect_patterns(open_, high, low, close):
+    """
+    Évalue toutes les figures sur toutes les bougies
+    Entrées : tableaux 1-D (une série) ou 2-D (symboles × bougies)
+    Retourne {figure: tableau booléen 2-D}, True si la figure se termine
+    sur la bougie ; False quand l'historique est insuffisant
+    """
+    o, h, l, c = (np.atleast_2d(np.asarray(x, dtype=float)) for x in (open_, high, low, close))
+
+    body = np.abs(c - o)
+    candle_range = h - l
+    top = np.maximum(o, c)
+    bottom = np.minimum(o, c)
+    upper = h - top
+    lower = bottom - l
+    green = c > o
+    red = c < o
+
+    # Corps comparé à la moyenne des BODY_WINDOW bougies précédentes
+    avg_body = _shift(rolling_mean(body, BODY_WINDOW), 1)
+    long_body = body > avg_body
+    small_body = body < avg_body * 0.5
+
+    prev_close = _shift(c)
+    uptrend = prev_close > _shift(c, TREND_WINDOW + 1)
+    downtrend = prev_close < _shift(c, TREND_WINDOW + 1)
+
+    with np.errstate(invalid='ignore'):
+        doji = (candle_range > 0) & (body <= candle_range * 0.1)
+        # Petit corps en haut (resp. en bas) de la bougie, longue mèche opposée
+        low_wick = (body <= candle_range * 0.35) & (lower >= 2 * body) & (upper <= candle_range * 0.1) & ~doji
+        high_wick = (body <= candle_range * 0.35) & (upper >= 2 * body) & (lower <= candle_range * 0.1) & ~doji
+
+        prev_open, prev_body = _shift(o), _shift(body)
+        prev_green, prev_red = _shift(green) == 1, _shift(red) == 1
+        prev_top, prev_bottom = _shift(top), _shift(bottom)
+        prev_mid = (prev_open + prev_close) / 2
+
+        engulfs = (((o <= prev_bottom) & (c >= prev_top)) | ((o >= prev_top) & (c <= prev_bottom))) \
+            & (body > prev_body)
+        inside = (top < prev_top) & (bottom > prev_bottom)
+        prev_long = _shift(long_body) == 1
+
+        # Étoiles : grand corps, petit corps décalé, puis bougie inverse
+        # qui referme plus de la moitié du premier corps
+        first_long = _shift(long_body, 2) == 1
+        first_mid = (_shift(o, 2) + _shift(c, 2)) / 2
+        star_small = _shift(small_body) == 1
+
+        # Trois bougies de même couleur, clôtures croissantes (resp.
+        # décroissantes), chaque ouverture dans le corps précédent
+        def three_in_row(color, rising):
+            same = color & (_shift(color) == 1) & (_shift(color, 2) == 1)
+            closes = (c > prev_close) & (prev_close > _shift(c, 2)) if rising \
+                else (c < prev_close) & (prev_close < _shift(c, 2))
+            opens_inside = (o >= prev_bottom) & (o <= prev_top) & \
+                (prev_open >= _shift(bottom, 2)) & (prev_open <= _shift(top, 2))
+            shadow = upper if rising else lower
+            return same & closes & opens_inside & (shadow <= body * 0.3) & long_body
+
+        return {
+            'doji': doji,
+            'hammer': low_wick & downtrend,
+            'inverted_hammer': high_wick & downtrend,
+            'hanging_man': low_wick & uptrend,
+            'shooting_star': high_wick & uptrend,
+            'bullish_engulfing': green & prev_red & engulfs,
+            'bearish_engulfing': red & prev_green & engulfs,
+            'bullish_harami': green & prev_red & prev_long & inside,
+            'bearish_harami': red & prev_green & prev_long & inside,
+            'piercing_line': green & prev_red & prev_long & (o < _shift(l)) & (c > prev_mid) & (c < prev_open),
+            'dark_cloud_cover': red & prev_green & prev_long & (o > _shift(h)) & (c < prev_mid) & (c > prev_open),
+            'morning_star': green & (_shift(red, 2) == 1) & first_long & star_small &
+                            (prev_top < _shift(c, 2)) & (c > first_mid),
+            'evening_star': red & (_shift(green, 2) == 1) & first_long & star_small &
+                            (prev_bottom > _shift(c, 2)) & (c < first_mid),
+            'three_white_soldiers': three_in_row(green, True),
+            'three_black_crows': three_in_row(red, False)
+        }
+
+
+def panel_patterns(panel):
+    """Figures de toutes les bougies d'un panel (voir panel_indicators.build_panel)"""
+    return detect_patterns(panel['open'], panel['high'], panel['low'], panel['close'])
+
+
+def frame_patterns(df):
+    """Figures de toutes les bougies d'un DataFrame OHLCV, {figure: tableau 1-D}"""
+    patterns = detect_patterns(df['open'], df['high'], df['low'], df['close'])
+    return {name: hits[0] for name, hits in patterns.items()}
+
+
+def recent_patterns(patterns, lookback=1, names=None):
+    """
+    Figures apparues sur les lookback dernières bougies de chaque ligne
+    Retourne une liste (par ligne du panel) de libellés
+    """
+    names = names or list(PATTERNS)
+    hits = np.stack([patterns[name][:, -lookback:].any(axis=1) for name in names], axis=1)
+    return [[PATTERNS[names[j]][0] for j in np.flatnonzero(row)] for row in hits]
+
+
+def scan_patterns(frames, names=None, lookback=1, length=None):
+    """
+    Recherche des figures sur tout un marché
+    frames : {symbole: DataFrame OHLCV} ; names restreint la recherche
+    Retourne {symbole: [libellés]} pour les symboles présentant au moins
+    une des figures sur leurs lookback dernières bougies
+    """
+    symbols, panel = build_panel(frames, length)
+    if not symbols:
+        return {}
+    found = recent_patterns(panel_patterns(panel), lookback, names)
+    return {symbol: labels for symbol, labels in zip(symbols, found) if labels}
@@ -0,0 +1,146 @@
+# feature_store.py
+import os
+import threading
+import ccxt
+import numpy as np
+from ohlcv_store import DATA_DIR
+
+
+class FeatureStore:
+    """
+    Stockage en colonnes des features IA par (symbole, timeframe, version)
+    Les features de chaque bougie clôturée sont calculées une seule fois puis
+    ajoutées ; les fichiers .npy (data/features) sont relus en mémoire mappée
+    et les lectures renvoient des vues, sans copie
+    """
+    def __init__(self, compute_features, version, directory=None, warmup=250):
+        self.compute_features = compute_features
+        self.version = version
+        self.warmup = warmup  # Historique nécessaire aux indicateurs des nouvelles bougies
+        self.directory = directory or os.path.join(DATA_DIR, 'features')
+        os.makedirs(self.directory, exist_ok=True)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def _prefix(self, symbol, timeframe):
+        name = f"{symbol.replace('/', '-').replace(':', '-')}_{timeframe}_v{self.version}"
+        return os.path.join(self.directory, name)
+
+    def _load(self, symbol, timeframe):
+        key = (symbol, timeframe)
+        if key not in self._series:
+            prefix = self._prefix(symbol, timeframe)
+            try:
+                self._series[key] = {
+                    column: np.load(f"{prefix}_{column}.npy", mmap_mode='r')
+                    for column in ('timestamp', 'close', 'features')
+                }
+            except (OSError, ValueError):
+                self._series[key] = None
+        return self._series[key]
+
+    def _save(self, symbol, timeframe, series):
+        # Écriture dans un fichier temporaire puis remplacement atomique : les
+        # vues en mémoire mappée déjà renvoyées gardent l'ancien fichier
+        prefix = self._prefix(symbol, timeframe)
+        try:
+            for column, values in series.items():
+                path = f"{prefix}_{column}.npy"
+                with open(f"{path}.tmp", 'wb') as f:
+                    np.save(f, values)
+                os.replace(f"{path}.tmp", path)
+        except OSError as e:
+            print(f"Sauvegarde des features impossible: {str(e)}")
+
+    def last_timestamp(self, symbol, timeframe):
+        """Horodatage (ms) de la dernière bougie stockée, None si vide"""
+        with self._lock:
+            series = self._load(symbol, timeframe)
+        return int(series['timestamp'][-1]) if series is not None else None
+
+    def update(self, symbol, timeframe, df):
+        """
+        Ajoute les features des bougies clôturées absentes du stockage
+        La dernière ligne de df (bougie en cours) est ignorée
+        Retourne le nombre de bougies ajoutées
+        """
+        timestamps = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        with self._lock:
+            series = self._load(symbol, timeframe)
+            last = int(series['timestamp'][-1]) if series is not None else None
+
+            closed = len(df) - 1
+            first_new = 0 if last is None else int(np.searchsorted(timestamps[:closed], last, side='right'))
+            if first_new >= closed:
+                return 0
+
+            start = max(0, first_new - self.warmup)
+            window = df.iloc[start:closed]
+            new_rows = closed - first_new
+            features = self.compute_features(window).to_numpy(dtype=float)[-new_rows:]
+
+            new_series = {
+                'timestamp': timestamps[first_new:closed],
+                'close': df['close'].to_numpy(dtype=float)[first_new:closed],
+                'features': features
+            }
+            if series is not None:
+                new_series = {
+                    column: np.concatenate([series[column], values])
+                    for column, values in new_series.items()
+                }
+            # Ordre Fortran : chaque feature est contiguë en mémoire
+            new_series['features'] = np.asfortranarray(new_series['features'])
+
+            self._save(symbol, timeframe, new_series)
+            self._series[(symbol, timeframe)] = new_series
+            return new_rows
+
+    def get(self, symbol, timeframe, start=None, end=None):
+        """
+        Vues (sans copie) sur les colonnes stockées entre start et end (ms, inclus)
+        Retourne None si la série est vide
+        """
+        with self._lock:
+            series = self._load(symbol, timeframe)
+        if series is None:
+            return None
+        timestamps = series['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='right'))
+        return {column: values[lo:hi] for column, values in series.items()}
+
+    def training_arrays(self, symbol, timeframe, start=None, end=None):
+        """
+        Features et labels (hausse de la bougie suivante) prêts pour l'entraînement
+        Seules les lignes complètes suivies d'une bougie consécutive sont gardées
+        """
+        series = self.get(symbol, timeframe, start, end)
+        if series is None or len(series['timestamp']) < 2:
+            return np.empty((0, 0)), np.empty(0, dtype=int)
+
+        timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        features = series['features'][:-1]
+        consecutive = np.diff(series['timestamp']) == timeframe_ms
+        rows = consecutive & np.isfinite(features).all(axis=1)
+        labels = (series['close'][1:] > series['close'][:-1]).astype(int)
+        # Cas courant : seules les premières lignes (indicateurs en amorçage)
+        # sont incomplètes, le reste est renvoyé sous forme de vue
+        first = int(np.argmax(rows)) if rows.any() else len(rows)
+        if rows[first:].all():
+            return features[first:], labels[first:]
+        return features[rows], labels[rows]
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_feature_store(compute_features, version):
+    """
+    Retourne le stockage de features partagé pour une version donnée
+    """
+    with _stores_lock:
+        if version not in _stores:
+            _stores[version] = FeatureStore(compute_features, version)
+    return _stores[version]
@@ -0,0 +1,136 @@
+# history_downloader.py
+"""
+Téléchargement en masse de l'historique OHLCV
+
+Usage :
+    python history_downloader.py BTC/USDT ETH/USDT --timeframe 1h --days 90 --workers 4
+
+L'historique est parcouru page par page (fetch_ohlcv avec since), plusieurs
+symboles en parallèle dans la limite du token bucket de l'exchange. Les
+bougies sont écrites dans le stockage local (une partition par symbole et
+timeframe) et la progression est sauvegardée après chaque page : un
+téléchargement interrompu reprend là où il s'était arrêté.
+"""
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ohlcv_store import DATA_DIR, MAX_OHLCV_PAGE, fetch_ohlcv_pages, get_ohlcv_store
+
+
+class HistoryDownloader:
+    """
+    Télécharge l'historique de plusieurs symboles avec reprise sur interruption
+    """
+    def __init__(self, exchange, store=None, max_workers=4, page_size=MAX_OHLCV_PAGE,
+                 checkpoint_path=None):
+        self.exchange = exchange
+        self.store = store or get_ohlcv_store()
+        self.max_workers = max_workers
+        self.page_size = page_size
+        self.checkpoint_path = checkpoint_path or os.path.join(DATA_DIR, 'downloads', 'checkpoint.json')
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._checkpoint = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_checkpoint(self, key, entry):
+        """Enregistre la progression d'une série (écriture atomique)"""
+        with self._lock:
+            self._checkpoint[key] = entry
+            tmp_path = f"{self.checkpoint_path}.tmp"
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._checkpoint, f)
+                os.replace(tmp_path, self.checkpoint_path)
+            except OSError as e:
+                print(f"Sauvegarde de la progression impossible: {str(e)}")
+
+    def _resume_from(self, key, since):
+        """
+        Point de reprise d'une série : dernière bougie écrite si l'historique
+        sauvegardé couvre déjà since, sinon since
+        Retourne (début de l'historique sauvegardé, curseur)
+        """
+        entry = self._checkpoint.get(key)
+        if entry and entry['since'] <= since <= entry['last']:
+            return entry['since'], entry['last']
+        return since, since
+
+    def download_symbol(self, symbol, timeframe, since, until=None):
+        """
+        Télécharge une série de since à until (ms, maintenant par défaut)
+        Retourne le nombre de bougies écrites
+        """
+        key = f"{symbol}|{timeframe}"
+        origin, cursor = self._resume_from(key, since)
+
+        candles = 0
+        # La dernière bougie écrite est relue : elle était peut-être encore ouverte
+        for page in fetch_ohlcv_pages(self.exchange, symbol, timeframe, cursor, until, self.page_size):
+            self.store.append(symbol, timeframe, page)
+            candles += len(page)
+            self._save_checkpoint(key, {'since': origin, 'last': page[-1][0]})
+        return candles
+
+    def download(self, symbols, timeframe='1h', since=None, until=None, days=30):
+        """
+        Télécharge l'historique de tous les symboles en parallèle
+        since/until en ms ; par défaut les days derniers jours
+        Retourne les statistiques (bougies, durée, débit, erreurs)
+        """
+        since = since or int((time.time() - days * 86400) * 1000)
+        start = time.perf_counter()
+        results, errors = {}, {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self.download_symbol, symbol, timeframe, since, until): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    results[symbol] = future.result()
+                    print(f"{symbol}: {results[symbol]} bougies")
+                except Exception as e:
+                    errors[symbol] = str(e)
+                    print(f"Erreur de téléchargement pour {symbol}: {str(e)}")
+
+        elapsed = time.perf_counter() - start
+        candles = sum(results.values())
+        return {
+            'candles': candles,
+            'seconds': elapsed,
+            'candles_per_second': candles / elapsed if elapsed else 0.0,
+            'symbols': results,
+            'errors': errors
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Téléchargement de l'historique OHLCV")
+    parser.add_argument('symbols', nargs='+', help="Symboles, ex. BTC/USDT")
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--days', type=int, default=30, help="Profondeur d'historique")
+    parser.add_argument('--workers', type=int, default=4, help="Symboles téléchargés en parallèle")
+    args = parser.parse_args()
+
+    # Import tardif : utils charge Streamlit, inutile pour réutiliser la classe
+    from utils import get_exchange
+    downloader = HistoryDownloader(get_exchange(), max_workers=args.workers)
+    stats = downloader.download(args.symbols, args.timeframe, days=args.days)
+    print(f"\n{stats['candles']} bougies en {stats['seconds']:.1f}s "
+          f"({stats['candles_per_second']:.0f} bougies/s), {len(stats['errors'])} erreur(s)")
+
+
+if __name__ == '__main__':
+    main()
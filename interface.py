@@ -1,6 +1,5 @@
 # interface.py
 import streamlit as st
-import time
 from datetime import datetime, timedelta
 import plotly.graph_objects as go
 import pandas as pd
@@ -11,9 +10,18 @@ from utils import (
     format_number,
     get_exchange  # Ajout de cet import
 )
-from technical_analysis import SignalGenerator, TechnicalAnalysis  # Ajout de TechnicalAnalysis
+from technical_analysis import SignalGenerator, TechnicalAnalysis, IndicatorContext  # Ajout de TechnicalAnalysis
+from market_data import get_ticker_snapshot, get_ohlcv_fetcher
+from resampling import fetch_timeframes, timeframe_ms
+from symbol_index import get_symbol_index
+from volume_levels import get_level_cache
+from candlestick_patterns import PATTERNS, PATTERN_HISTORY, scan_patterns
+from run_length import green_candle_stats
+from streaming_indicators import get_indicator_engine
 from portfolio_management import PortfolioManager  # Ajout de cet import
-from ai_predictor import AIPredictor, AITester  # Ajout de ces imports
+
+# Bougies d'amorçage des indicateurs (EMA 50, MACD 26 + 9) avant la période affichée
+INDICATOR_WARMUP = 100
 
 
 class LiveAnalysisPage:
@@ -29,6 +37,10 @@ class LiveAnalysisPage:
         col1, col2 = st.columns([3, 1])
         with col1:
             symbol = st.text_input("Entrez le symbole de la crypto (ex: BTC, ETH)", "").upper()
+            if symbol:
+                suggestions = get_symbol_index(self.exchange).search(symbol, limit=8)
+                if suggestions and suggestions != [symbol]:
+                    st.caption("Suggestions : " + ", ".join(suggestions))
 
         # Gestion des cryptos suivies
         self._manage_tracked_coins(symbol)
@@ -69,6 +81,10 @@ class LiveAnalysisPage:
                 df = calculate_timeframe_data(self.exchange, valid_symbol, '1h', 100)
                 
                 if df is not None:
+                    # Indicateurs incrémentaux : seules les bougies clôturées
+                    # depuis le dernier rafraîchissement sont intégrées
+                    live = get_indicator_engine().sync(valid_symbol, '1h', df)
+
                     # Création d'un container pour cette crypto
                     with st.container():
                         # En-tête avec les infos principales
@@ -89,17 +105,34 @@ class LiveAnalysisPage:
                                 None
                             )
                         with col3:
-                            rsi = self.ta.calculate_rsi(df).iloc[-1]
                             st.metric(
                                 "RSI",
-                                f"{rsi:.1f}",
+                                _format_indicator(live['rsi']),
                                 None,
-                                help="RSI > 70: Suracheté, RSI < 30: Survendu"
+                                help="RSI > 70: Suracheté, RSI < 30: Survendu (dernière bougie clôturée)"
                             )
 
+                        # Deuxième ligne : tendance et momentum
+                        col1, col2, col3 = st.columns(3)
+                        with col1:
+                            ema9, ema20, ema50 = live['ema9'], live['ema20'], live['ema50']
+                            if None in (ema9, ema20, ema50):
+                                trend = "N/A"
+                            elif ema9 > ema20 > ema50:
+                                trend = "🟢 Haussière"
+                            elif ema9 < ema20 < ema50:
+                                trend = "🔴 Baissière"
+                            else:
+                                trend = "⚪ Neutre"
+                            st.metric("Tendance EMA 9/20/50", trend)
+                        with col2:
+                            st.metric("MACD (histogramme)", _format_indicator(live['macd_diff'], 8))
+                        with col3:
+                            st.metric("ADX", _format_indicator(live['adx']),
+                                      help="ADX > 25 : tendance marquée")
+
                         # Analyse de la tendance des bougies
-                        last_candles = df.tail(5)  # Prendre les 5 dernières bougies
-                        green_candles = sum(last_candles['close'] > last_candles['open'])
+                        green_candles, consecutive_green = green_candle_stats(df, 5)  # 5 dernières bougies
                         trend_strength = green_candles / 5 * 100
 
                         # Afficher l'analyse des bougies
@@ -112,12 +145,6 @@ class LiveAnalysisPage:
                                 f"{trend_strength:.0f}% haussier"
                             )
                         with col2:
-                            consecutive_green = 0
-                            for i in range(len(last_candles)-1, -1, -1):
-                                if last_candles.iloc[i]['close'] > last_candles.iloc[i]['open']:
-                                    consecutive_green += 1
-                                else:
-                                    break
                             st.metric(
                                 "Bougies vertes consécutives",
                                 f"{consecutive_green}",
@@ -191,6 +218,11 @@ class LiveAnalysisPage:
             st.error(f"Erreur pour {coin}: {str(e)}")
 
         
+def _format_indicator(value, decimals=1):
+    """Valeur d'indicateur formatée, N/A tant que l'historique est insuffisant"""
+    return "N/A" if value is None else f"{value:.{decimals}f}"
+
+
 class PortfolioPage:
     def __init__(self, portfolio_manager):
         self.portfolio = portfolio_manager
@@ -732,6 +764,11 @@ class OpportunitiesPage:
             max_price = st.number_input("Prix maximum (USDT)", 
                                       value=20.0,
                                       help="Filtrer les cryptos selon leur prix unitaire")
+        candle_patterns = st.multiselect(
+            "Figures de chandeliers",
+            [label for label, _ in PATTERNS.values()],
+            help="Ne garder que les cryptos présentant l'une de ces figures sur la dernière bougie"
+        )
 
         # Avertissement
         st.info("""
@@ -743,78 +780,83 @@ class OpportunitiesPage:
         """)
 
         if st.button("🔍 Rechercher des opportunités"):
-            self._search_opportunities(min_var, min_vol, min_score, timeframe, max_price)
+            self._search_opportunities(min_var, min_vol, min_score, timeframe, max_price, candle_patterns)
             
 
-    def _search_opportunities(self, min_var, min_vol, min_score, timeframe, max_price):
+    def _search_opportunities(self, min_var, min_vol, min_score, timeframe, max_price, candle_patterns=None):
         try:
-            markets = self.exchange.load_markets()
-            usdt_pairs = [symbol for symbol in markets.keys() if symbol.endswith('USDT')]
+            # Un seul appel pour tous les tickers, filtre initial en mémoire
+            snapshot = get_ticker_snapshot(self.exchange)
+            candidates = snapshot.filter(max_price=max_price, min_volume=min_vol)
             
             opportunities = []
             progress_bar = st.progress(0)
             status_text = st.empty()
 
-            for i, symbol in enumerate(usdt_pairs):
+            # Téléchargement parallèle des bougies des seuls survivants
+            fetcher = get_ohlcv_fetcher(self.exchange)
+            frames = {}
+            for i, (symbol, df) in enumerate(fetcher.iter_fetch(list(candidates), timeframe, 100)):
+                status_text.text(f"Analyse de {symbol}...")
+                if df is not None:
+                    frames[symbol] = df
+                progress_bar.progress((i + 1) / len(candidates))
+
+            # Score technique et signaux de tous les symboles en une passe
+            evaluations = SignalGenerator.batch_evaluate(
+                frames, {symbol: candidates[symbol]['last'] for symbol in frames})
+            # Figures de chandeliers de la dernière bougie, tout le marché en une passe
+            found_patterns = scan_patterns(frames, lookback=1, length=PATTERN_HISTORY)
+
+            for symbol, df in frames.items():
                 try:
-                    status_text.text(f"Analyse de {symbol}...")
-                    ticker = self.exchange.fetch_ticker(symbol)
+                    ticker = candidates[symbol]
                     price = ticker['last']
+                    patterns = found_patterns.get(symbol, [])
+                    if candle_patterns and not any(p in patterns for p in candle_patterns):
+                        continue
                     
-                    # Filtre initial sur prix et volume
-                    if price <= max_price and ticker['quoteVolume'] >= min_vol:
-                        df = calculate_timeframe_data(self.exchange, symbol, timeframe, 100)
-                        if df is not None:
-                            # 1. Vérification des bougies vertes consécutives
-                            last_candles = df.tail(3)  # Prendre les 3 dernières bougies
-                            green_candles = sum(last_candles['close'] > last_candles['open'])
-                            consecutive_green = 0
-                            for idx in range(len(last_candles)-1, -1, -1):
-                                if last_candles.iloc[idx]['close'] > last_candles.iloc[idx]['open']:
-                                    consecutive_green += 1
-                                else:
-                                    break
-                                    
-                            # 2. Vérification du volume croissant
-                            volume_growing = (df['volume'].iloc[-1] > df['volume'].iloc[-2] > df['volume'].iloc[-3])
-                            
-                            # 3. Calcul de la distance au support
-                            support, resistance = self.ta.calculate_support_resistance(df)
-                            distance_to_support = ((price - support) / price) * 100
-                            
-                            # 4. Calcul du RSI
-                            rsi = self.ta.calculate_rsi(df).iloc[-1]
-                            
-                            # 5. Calcul du score technique
-                            signal_gen = SignalGenerator(df, price)
-                            score = signal_gen.calculate_opportunity_score()
-                            signals = signal_gen.generate_trading_signals()
-                            
-                            # Configuration idéale
-                            ideal_setup = (
-                                score >= min_score and          # Score minimum
-                                consecutive_green >= 2 and      # Au moins 2 bougies vertes consécutives
-                                volume_growing and              # Volume croissant
-                                30 <= rsi <= 45 and            # RSI dans la zone idéale
-                                0 <= distance_to_support <= 2   # Support proche
-                            )
-                            
-                            if ideal_setup:
-                                opportunities.append({
-                                    'symbol': symbol.replace('/USDT', ''),
-                                    'price': price,
-                                    'score': score,
-                                    'green_candles': consecutive_green,
-                                    'rsi': rsi,
-                                    'distance_to_support': distance_to_support,
-                                    'volume_trend': "Croissant" if volume_growing else "Décroissant",
-                                    'change_24h': ticker['percentage'],
-                                    'volume': ticker['quoteVolume'],
-                                    'signal': signals['action'],
-                                    'reasons': signals['reasons']
-                                })
-                    
-                    progress_bar.progress((i + 1) / len(usdt_pairs))
+                    if df is not None:
+                        # 1. Vérification des bougies vertes consécutives
+                        green_candles, consecutive_green = green_candle_stats(df, 3)  # 3 dernières bougies
+                                
+                        # 2. Vérification du volume croissant
+                        volume_growing = (df['volume'].iloc[-1] > df['volume'].iloc[-2] > df['volume'].iloc[-3])
+                        
+                        # 3. Calcul de la distance au support
+                        support, resistance = self.ta.calculate_support_resistance(df)
+                        distance_to_support = ((price - support) / price) * 100
+                        
+                        # 4. Calcul du RSI
+                        rsi = self.ta.calculate_rsi(df).iloc[-1]
+                        
+                        # 5. Score technique (calculé en lot)
+                        score, signals = evaluations[symbol]
+                        
+                        # Configuration idéale
+                        ideal_setup = (
+                            score >= min_score and          # Score minimum
+                            consecutive_green >= 2 and      # Au moins 2 bougies vertes consécutives
+                            volume_growing and              # Volume croissant
+                            30 <= rsi <= 45 and            # RSI dans la zone idéale
+                            0 <= distance_to_support <= 2      # Support proche
+                        )
+                        
+                        if ideal_setup:
+                            opportunities.append({
+                                'symbol': symbol.replace('/USDT', ''),
+                                'price': price,
+                                'score': score,
+                                'green_candles': consecutive_green,
+                                'rsi': rsi,
+                                'distance_to_support': distance_to_support,
+                                'volume_trend': "Croissant" if volume_growing else "Décroissant",
+                                'change_24h': ticker['percentage'],
+                                'volume': ticker['quoteVolume'],
+                                'signal': signals['action'],
+                                'reasons': signals['reasons'],
+                                'patterns': patterns
+                            })
                     
                 except Exception as e:
                     continue
@@ -850,6 +892,8 @@ class OpportunitiesPage:
                         with conf_col2:
                             st.write(f"• Score technique: {opp['score']:.2f}")
                             st.write(f"• RSI: {opp['rsi']:.1f}")
+                        if opp['patterns']:
+                            st.write(f"• Figures : {', '.join(opp['patterns'])}")
                         
                         # Raisons détaillées
                         if opp['reasons']:
@@ -910,16 +954,20 @@ class HistoricalAnalysisPage:
 
     def _perform_historical_analysis(self, symbol, timeframe, lookback):
         try:
-            # Récupération des données
-            df = calculate_timeframe_data(self.exchange, symbol, timeframe, lookback * 24)
+            # Récupération des données : une seule série 1h, 4h et 1d en sont dérivés
+            limit = lookback * 86400 * 1000 // timeframe_ms(timeframe)
+            full = fetch_timeframes(self.exchange, symbol, [timeframe], limit + INDICATOR_WARMUP)[timeframe]
             
-            if df is not None and not df.empty:
-                # Calcul des indicateurs
-                df['rsi'] = self.ta.calculate_rsi(df)
-                df['ema9'] = ta.trend.ema_indicator(df['close'], window=9)
-                df['ema20'] = ta.trend.ema_indicator(df['close'], window=20)
-                df['ema50'] = ta.trend.ema_indicator(df['close'], window=50)
-                df['macd'] = ta.trend.macd_diff(df['close'])
+            if full is not None and not full.empty:
+                # Calcul des indicateurs sur tout l'historique (full est partagé
+                # par le cache : pas de nouvelles colonnes), affichage de la période
+                context = IndicatorContext.of(full)
+                df = full.iloc[-limit:]
+                rsi = self.ta.calculate_rsi(full).iloc[-limit:]
+                ema9 = context.ema(9).iloc[-limit:]
+                ema20 = context.ema(20).iloc[-limit:]
+                ema50 = context.ema(50).iloc[-limit:]
+                macd = context.macd_diff().iloc[-limit:]
                 
                 # Prix actuel et variation
                 current_price = df['close'].iloc[-1]
@@ -950,12 +998,23 @@ class HistoricalAnalysisPage:
                 ))
                 
                 # EMAs
-                fig.add_trace(go.Scatter(x=df.index, y=df['ema9'], 
+                fig.add_trace(go.Scatter(x=df.index, y=ema9, 
                                        name="EMA 9", line=dict(color='blue')))
-                fig.add_trace(go.Scatter(x=df.index, y=df['ema20'], 
+                fig.add_trace(go.Scatter(x=df.index, y=ema20, 
                                        name="EMA 20", line=dict(color='orange')))
-                fig.add_trace(go.Scatter(x=df.index, y=df['ema50'], 
+                fig.add_trace(go.Scatter(x=df.index, y=ema50, 
                                        name="EMA 50", line=dict(color='red')))
+
+                # Niveaux du profil de volume, recalculés seulement à la clôture
+                # d'une nouvelle bougie du couple (symbole, timeframe)
+                levels = get_level_cache().get_levels({(symbol, timeframe): df})[(symbol, timeframe)]
+                levels = {side: found[:3] for side, found in levels.items()}
+                for level in levels['supports']:
+                    fig.add_hline(y=level['price'], line_dash="dot", line_color="green",
+                                  opacity=0.3 + 0.7 * level['strength'])
+                for level in levels['resistances']:
+                    fig.add_hline(y=level['price'], line_dash="dot", line_color="red",
+                                  opacity=0.3 + 0.7 * level['strength'])
                 
                 fig.update_layout(
                     title=f"Analyse de {symbol}",
@@ -970,7 +1029,7 @@ class HistoricalAnalysisPage:
                 # RSI
                 st.subheader("RSI")
                 fig_rsi = go.Figure()
-                fig_rsi.add_trace(go.Scatter(x=df.index, y=df['rsi'], name="RSI"))
+                fig_rsi.add_trace(go.Scatter(x=df.index, y=rsi, name="RSI"))
                 fig_rsi.add_hline(y=70, line_dash="dash", line_color="red")
                 fig_rsi.add_hline(y=30, line_dash="dash", line_color="green")
                 fig_rsi.update_layout(
@@ -983,7 +1042,7 @@ class HistoricalAnalysisPage:
                 # MACD
                 st.subheader("MACD")
                 fig_macd = go.Figure()
-                fig_macd.add_trace(go.Scatter(x=df.index, y=df['macd'], name="MACD"))
+                fig_macd.add_trace(go.Scatter(x=df.index, y=macd, name="MACD"))
                 fig_macd.add_hline(y=0, line_dash="dash", line_color="gray")
                 fig_macd.update_layout(
                     height=200,
@@ -993,16 +1052,27 @@ class HistoricalAnalysisPage:
                 st.plotly_chart(fig_macd, use_container_width=True)
                 
                 # Niveaux clés
-                support, resistance = self.ta.calculate_support_resistance(df)
+                support, resistance = self.ta.calculate_support_resistance(full)
                 st.subheader("Niveaux clés")
                 col1, col2 = st.columns(2)
                 with col1:
                     st.metric("Support", f"${support:.4f}")
                 with col2:
                     st.metric("Résistance", f"${resistance:.4f}")
+
+                st.markdown("#### 📊 Niveaux de volume")
+                col1, col2 = st.columns(2)
+                with col1:
+                    for level in levels['supports']:
+                        st.write(f"🟢 ${level['price']:.4f} · force {level['strength']:.0%} "
+                                 f"({level['volume_share']:.1%} du volume)")
+                with col2:
+                    for level in levels['resistances']:
+                        st.write(f"🔴 ${level['price']:.4f} · force {level['strength']:.0%} "
+                                 f"({level['volume_share']:.1%} du volume)")
                 
                 # Analyse du signal actuel
-                signal_gen = SignalGenerator(df, current_price)
+                signal_gen = SignalGenerator(full, current_price)
                 signals = signal_gen.generate_trading_signals()
                 
                 # Affichage du signal
@@ -1030,17 +1100,29 @@ class TopPerformancePage:
 
     def _analyze_and_display_opportunities(self, min_volume, min_score):
         try:
-            markets = self.exchange.load_markets()
-            usdt_pairs = [symbol for symbol in markets.keys() if symbol.endswith('USDT')]
+            snapshot = get_ticker_snapshot(self.exchange)
+            candidates = snapshot.filter(max_price=20.0, min_volume=float(min_volume))
             
             opportunities = []
             progress_bar = st.progress(0)
             status_text = st.empty()
             
-            for i, symbol in enumerate(usdt_pairs):
+            fetcher = get_ohlcv_fetcher(self.exchange)
+            frames = {}
+            for i, (symbol, df) in enumerate(fetcher.iter_fetch(list(candidates), '1h', 100)):
+                status_text.text(f"Analyse de {symbol}...")
+                if df is not None and not df.empty:
+                    frames[symbol] = df
+                progress_bar.progress(min((i + 1) / len(candidates), 1.0))
+            
+            # Score technique et signaux de tous les symboles en une passe
+            # (prix valides garantis par snapshot.filter)
+            evaluations = SignalGenerator.batch_evaluate(
+                frames, {symbol: float(candidates[symbol]['last']) for symbol in frames})
+            
+            for symbol, df in frames.items():
                 try:
-                    status_text.text(f"Analyse de {symbol}...")
-                    ticker = self.exchange.fetch_ticker(symbol)
+                    ticker = candidates[symbol]
                     
                     # Vérification des valeurs avec conversions explicites
                     try:
@@ -1058,7 +1140,6 @@ class TopPerformancePage:
                     if not (0 < price <= 20.0 and volume >= float(min_volume)):
                         continue
                         
-                    df = calculate_timeframe_data(self.exchange, symbol, '1h', 100)
                     if df is None or df.empty:
                         continue
                         
@@ -1072,10 +1153,9 @@ class TopPerformancePage:
                         market_sentiment = float(self.ta.get_market_sentiment(df))
                         volume_profile = float(self.ta.analyze_volume_profile(df))
                         
-                        # Génération des signaux
-                        signal_gen = SignalGenerator(df, price)
-                        score = float(signal_gen.calculate_opportunity_score())
-                        signals = signal_gen.generate_trading_signals()
+                        # Signaux calculés en lot
+                        score, signals = evaluations[symbol]
+                        score = float(score)
                         
                         if not all(x is not None for x in [rsi_value, market_sentiment, volume_profile, score]):
                             continue
@@ -1099,10 +1179,6 @@ class TopPerformancePage:
                     
                 except Exception as e:
                     continue
-                
-                finally:
-                    # Mise à jour de la progression
-                    progress_bar.progress(min((i + 1) / len(usdt_pairs), 1.0))
             
             progress_bar.empty()
             status_text.empty()
@@ -1196,19 +1272,24 @@ class GuidePage:
         pass
     
 class MicroBudgetTrading:
-    def __init__(self, exchange):
+    def __init__(self, exchange, ai_predictor=None):
         self.exchange = exchange
+        self.ai_predictor = ai_predictor
 
     def find_opportunities(self):
         try:
-            markets = {k: v for k, v in self.exchange.load_markets().items() 
-                      if k.endswith('/USDT')}
-            
             opportunities = []
-            all_tickers = self.exchange.fetch_tickers(list(markets.keys()))
+            snapshot = get_ticker_snapshot(self.exchange)
+            all_tickers = snapshot.filter(min_price=0.01, max_price=5, min_volume=10000)
             
-            for symbol, ticker in all_tickers.items():
+            fetcher = get_ohlcv_fetcher(self.exchange)
+            # 100 bougies : historique suffisant pour le MACD (26 + 9), réutilisé
+            # tel quel pour le score IA des opportunités retenues
+            frames = {}
+            
+            for symbol, df in fetcher.iter_fetch(list(all_tickers), '1h', 100):
                 try:
+                    ticker = all_tickers[symbol]
                     price = ticker['last']
                     volume = ticker['quoteVolume']
                     
@@ -1217,7 +1298,6 @@ class MicroBudgetTrading:
                         continue
                         
                     # Analyse technique détaillée
-                    df = calculate_timeframe_data(self.exchange, symbol, '1h', 24)
                     if df is None or df.empty:
                         continue
                     
@@ -1229,14 +1309,7 @@ class MicroBudgetTrading:
                     macd_prev = ta.trend.macd_diff(df['close']).iloc[-2]
                     
                     # Comptage des bougies vertes
-                    last_candles = df.tail(5)
-                    green_candles = sum(last_candles['close'] > last_candles['open'])
-                    consecutive_green = 0
-                    for i in reversed(range(len(last_candles))):
-                        if last_candles.iloc[i]['close'] > last_candles.iloc[i]['open']:
-                            consecutive_green += 1
-                        else:
-                            break
+                    green_candles, consecutive_green = green_candle_stats(df, 5)
                     
                     # Conditions strictes pour un bon trade
                     if not (30 <= rsi <= 45 and        # RSI en zone d'achat
@@ -1285,18 +1358,34 @@ class MicroBudgetTrading:
                         'green_candles': green_candles,
                         'consecutive_green': consecutive_green
                     })
+                    frames[symbol] = df
                 
                 except Exception as e:
                     continue
-                    
-                time.sleep(0.1)  # Respecter les limites de l'API
             
-            return sorted(opportunities, key=lambda x: x['score'], reverse=True)
+            self._add_ai_probabilities(opportunities, frames)
+            return sorted(opportunities, key=lambda x: x['ranking'], reverse=True)
             
         except Exception as e:
             print(f"Erreur détaillée: {str(e)}")
             return []
 
+    def _add_ai_probabilities(self, opportunities, frames):
+        """
+        Score IA groupé des opportunités retenues (un seul predict_proba)
+        frames : bougies déjà téléchargées par le scan, par paire
+        Le classement combine score technique (70%) et probabilité IA (30%)
+        """
+        probabilities = {}
+        if self.ai_predictor is not None and opportunities:
+            probabilities = self.ai_predictor.predict_batch(frames, '1h')
+
+        for opp in opportunities:
+            probability = probabilities.get(f"{opp['symbol']}/USDT")
+            opp['ai_probability'] = probability
+            # Probabilité inconnue : valeur neutre pour le classement
+            opp['ranking'] = opp['score'] * 0.7 + (0.5 if probability is None else probability) * 0.3
+
     def _format_opportunity(self, opp):
         """Formatage standard des opportunités"""
         return {
@@ -1342,8 +1431,7 @@ def _analyze_micro_opportunity(self, df, current_price, symbol):  # Ajout de sym
             reasons.append("Volume en augmentation")
     
         # 3. Analyse des bougies plus stricte
-        last_candles = df.tail(3)
-        green_candles = sum(last_candles['close'] > last_candles['open'])
+        green_candles, _ = green_candle_stats(df, 3)
         if green_candles >= 3:  # 3 bougies vertes requises
             score += 0.3
             reasons.append(f"3 bougies vertes consécutives")
@@ -1652,8 +1740,10 @@ class MicroTradingPage:
     def __init__(self, exchange, portfolio_manager, ai_predictor):
         self.exchange = exchange
         self.portfolio = portfolio_manager
-        self.micro_trader = MicroBudgetTrading(exchange)
+        self.micro_trader = MicroBudgetTrading(exchange, ai_predictor)
         self.ai_predictor = ai_predictor
+        # Import tardif : scikit-learn n'est chargé qu'à l'ouverture de cette page
+        from ai_predictor import AITester
         self.ai_tester = AITester(exchange, self.ai_predictor)
         
     def render(self):
@@ -1700,16 +1790,46 @@ class MicroTradingPage:
     
     def _render_testing_interface(self):
         st.subheader("🧪 Test des Prédictions")
+
+        # Latences du registre de modèles
+        if self.ai_predictor.registry is not None:
+            latency = self.ai_predictor.registry.latency_stats()
+            st.caption(
+                f"🧠 Modèles : chargement {latency['load']['mean_ms']:.0f} ms, "
+                f"entraînement {latency['fit']['mean_ms']:.0f} ms, "
+                f"prédiction {latency['predict']['mean_ms']:.1f} ms"
+            )
         
         col1, col2 = st.columns([2, 1])
         with col1:
             symbol = st.text_input("Crypto à tester (ex: BTC)", "").upper()
         with col2:
             days = st.number_input("Jours d'historique", min_value=7, value=30)
+
+        walk_forward = st.checkbox(
+            "Mode walk-forward",
+            value=True,
+            help="Features calculées une fois, modèle réentraîné périodiquement"
+        )
+        if walk_forward:
+            col1, col2 = st.columns(2)
+            with col1:
+                retrain_every = st.number_input("Réentraînement toutes les N bougies",
+                                                min_value=1, value=24)
+            with col2:
+                train_window = st.number_input("Fenêtre d'entraînement (0 = croissante)",
+                                               min_value=0, value=0, step=24)
             
         if st.button("🔬 Lancer le test"):
             with st.spinner("Test en cours..."):
-                results = self.ai_tester.backtest_predictions(f"{symbol}/USDT", days)
+                if walk_forward:
+                    results = self.ai_tester.walk_forward_backtest(
+                        f"{symbol}/USDT", days,
+                        retrain_every=int(retrain_every),
+                        train_window=int(train_window) or None
+                    )
+                else:
+                    results = self.ai_tester.backtest_predictions(f"{symbol}/USDT", days)
                 
                 if results:
                     # Affichage des métriques
@@ -1722,6 +1842,22 @@ class MicroTradingPage:
                     with col3:
                         st.metric("Détection hausses", 
                                 f"{results['metrics']['recall']:.1%}")
+
+                    # Prédiction de la prochaine bougie : le modèle du symbole est
+                    # repris du registre tant qu'il n'est pas périmé
+                    df = calculate_timeframe_data(self.exchange, f"{symbol}/USDT", '1h', days * 24)
+                    if df is not None:
+                        prediction = self.ai_predictor.predict_movement(df, f"{symbol}/USDT", '1h')
+                        st.metric("Probabilité de hausse (prochaine bougie)",
+                                  f"{prediction['probability']:.0%}")
+
+                    # Détail par fold du walk-forward
+                    if 'folds' in results:
+                        st.caption(
+                            f"⏱️ {results['runtime']:.1f}s - "
+                            f"{results['fit_count']} entraînements"
+                        )
+                        st.dataframe(pd.DataFrame(results['folds']))
                     
                     # Visualisation
                     fig = self.ai_tester.visualize_results(results, symbol)
@@ -1753,6 +1889,10 @@ class MicroTradingPage:
             with col3:
                 profit = (opp['target'] - opp['price']) / opp['price'] * 100
                 st.metric("Profit potentiel", f"+{profit:.1f}%")
+
+            # Prédiction IA calculée en lot lors de la recherche
+            if opp.get('ai_probability') is not None:
+                st.metric("Probabilité de hausse (IA)", f"{opp['ai_probability']:.0%}")
         
             st.markdown("### Niveaux suggérés:")
             levels_col1, levels_col2, levels_col3 = st.columns(3)
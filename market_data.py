@@ -0,0 +1,118 @@
+# market_data.py
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+import streamlit as st
+from utils import fetch_ohlcv_dataframe
+
+
+class TickerSnapshot:
+    """
+    Instantané horodaté de tous les tickers de l'exchange
+    Un seul appel fetch_tickers remplace un fetch_ticker par paire
+    """
+    def __init__(self, tickers, timestamp=None):
+        self.tickers = tickers or {}
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    @classmethod
+    def fetch(cls, exchange, symbols=None):
+        """Récupère tous les tickers en une seule requête"""
+        return cls(exchange.fetch_tickers(symbols))
+
+    @property
+    def age(self):
+        """Âge de l'instantané en secondes"""
+        return time.time() - self.timestamp
+
+    @property
+    def fetched_at(self):
+        """Date de récupération de l'instantané"""
+        return datetime.fromtimestamp(self.timestamp)
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, symbol):
+        return symbol in self.tickers
+
+    def get(self, symbol, default=None):
+        """Retourne le ticker d'un symbole"""
+        return self.tickers.get(symbol, default)
+
+    def filter(self, quote='USDT', min_price=None, max_price=None, min_volume=None):
+        """
+        Filtre en mémoire les tickers sur le prix et le volume
+        Les tickers sans prix ou volume valides sont ignorés
+        """
+        selected = {}
+        for symbol, ticker in self.tickers.items():
+            if quote and not symbol.endswith(f"/{quote}"):
+                continue
+            try:
+                price = float(ticker.get('last') or 0)
+                volume = float(ticker.get('quoteVolume') or 0)
+            except (TypeError, ValueError):
+                continue
+
+            if price <= 0:
+                continue
+            if min_price is not None and price < min_price:
+                continue
+            if max_price is not None and price > max_price:
+                continue
+            if min_volume is not None and volume < min_volume:
+                continue
+            selected[symbol] = ticker
+        return selected
+
+
+@st.cache_resource(ttl=60)  # Partagé entre les pages, rafraîchi chaque minute
+def get_ticker_snapshot(_exchange):
+    """
+    Retourne l'instantané des tickers partagé par toutes les pages
+    Note: Le préfixe _ sur _exchange empêche Streamlit de hasher cet argument
+    """
+    return TickerSnapshot.fetch(_exchange)
+
+
+class OHLCVFetcher:
+    """
+    Télécharge les bougies de plusieurs symboles en parallèle
+    Le débit est limité par le token bucket de l'exchange (get_exchange)
+    """
+    def __init__(self, exchange, max_workers=8):
+        self.exchange = exchange
+        self.max_workers = max_workers
+
+    def _fetch_one(self, symbol, timeframe, limit):
+        try:
+            return fetch_ohlcv_dataframe(self.exchange, symbol, timeframe, limit)
+        except Exception as e:
+            print(f"Erreur OHLCV pour {symbol}: {str(e)}")
+            return None
+
+    def iter_fetch(self, symbols, timeframe='1h', limit=100):
+        """
+        Renvoie les couples (symbole, DataFrame) au fur et à mesure
+        DataFrame vaut None si le téléchargement a échoué
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                pool.submit(self._fetch_one, symbol, timeframe, limit): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def fetch_many(self, symbols, timeframe='1h', limit=100):
+        """Télécharge les bougies de tous les symboles, résultat par symbole"""
+        return dict(self.iter_fetch(symbols, timeframe, limit))
+
+
+@st.cache_resource
+def get_ohlcv_fetcher(_exchange):
+    """
+    Retourne le moteur de téléchargement partagé par tous les scanners
+    """
+    return OHLCVFetcher(_exchange)
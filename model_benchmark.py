@@ -0,0 +1,121 @@
+# model_benchmark.py
+"""
+Comparaison des backends de modèles d'AIPredictor
+
+Usage :
+    python model_benchmark.py BTC/USDT ETH/USDT --timeframe 1h --limit 1000 --train 200
+
+Tous les backends sont évalués sur les mêmes features (FeatureStore) :
+temps d'entraînement, latence d'une prédiction, mémoire et précision.
+"""
+import time
+import pickle
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score
+from sklearn.preprocessing import MinMaxScaler
+from ai_predictor import AIPredictor, MODEL_BACKENDS, make_model
+from feature_store import get_feature_store
+from model_search import horizon_dataset
+from utils import get_exchange, fetch_ohlcv_dataframe
+
+
+def benchmark_backend(model, X_train, y_train, X_test, y_test, repeats=50):
+    """Mesures d'un estimateur non entraîné sur un découpage train/test"""
+    scaler = MinMaxScaler().fit(X_train)
+    X_train, X_test = scaler.transform(X_train), scaler.transform(X_test)
+
+    start = time.perf_counter()
+    fitted = clone(model).fit(X_train, y_train)
+    fit_time = time.perf_counter() - start
+
+    # Pic mémoire mesuré sur un second entraînement, tracemalloc ralentissant le premier
+    tracemalloc.start()
+    clone(model).fit(X_train, y_train)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Latence d'une prédiction sur une seule ligne, comme dans predict_movement
+    latencies = []
+    for i in range(repeats):
+        row = X_test[i % len(X_test)][None, :]
+        start = time.perf_counter()
+        fitted.predict_proba(row)
+        latencies.append(time.perf_counter() - start)
+
+    return {
+        'fit_ms': fit_time * 1000,
+        'predict_ms': float(np.median(latencies)) * 1000,
+        'fit_peak_mb': peak / 2**20,
+        'model_kb': len(pickle.dumps(fitted)) / 2**10,
+        'accuracy': accuracy_score(y_test, fitted.predict(X_test))
+    }
+
+
+def benchmark_backends(X, y, backends=None, train_size=None, test_size=0.25, repeats=50):
+    """
+    Compare les backends sur les mêmes données
+    Découpage chronologique : les test_size dernières lignes servent au test,
+    train_size limite l'entraînement aux lignes qui les précèdent (fenêtre courte)
+    """
+    split = int(len(X) * (1 - test_size))
+    train_start = 0 if train_size is None else max(0, split - train_size)
+    X_train, y_train = X[train_start:split], y[train_start:split]
+    X_test, y_test = X[split:], y[split:]
+
+    results = []
+    for backend in backends or MODEL_BACKENDS:
+        results.append({
+            'backend': backend,
+            'train_rows': len(X_train),
+            **benchmark_backend(make_model(backend), X_train, y_train, X_test, y_test, repeats)
+        })
+    return pd.DataFrame(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison des backends d'AIPredictor")
+    parser.add_argument('symbols', nargs='+', help="Symboles, ex. BTC/USDT")
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--limit', type=int, default=1000, help="Nombre de bougies")
+    parser.add_argument('--train', type=int, default=None,
+                        help="Taille de la fenêtre d'entraînement (toutes les lignes par défaut)")
+    parser.add_argument('--backends', nargs='+', choices=list(MODEL_BACKENDS), default=None)
+    parser.add_argument('--repeats', type=int, default=50, help="Prédictions mesurées")
+    args = parser.parse_args()
+
+    exchange = get_exchange()
+    store = get_feature_store(AIPredictor.compute_features, AIPredictor.FEATURE_SET_VERSION)
+    tables = []
+    for symbol in args.symbols:
+        df = fetch_ohlcv_dataframe(exchange, symbol, args.timeframe, args.limit)
+        if df is None or len(df) < 2:
+            print(f"Données indisponibles pour {symbol}")
+            continue
+        store.update(symbol, args.timeframe, df)
+        start = int(df['timestamp'].iloc[0].value // 10**6)
+        series = store.get(symbol, args.timeframe, start=start)
+        rows, y = horizon_dataset(series, args.timeframe, 1)
+        if len(rows) < 20:
+            print(f"Historique insuffisant pour {symbol}")
+            continue
+        X = np.asarray(series['features'])[rows]
+        table = benchmark_backends(X, y, args.backends, args.train, repeats=args.repeats)
+        table.insert(0, 'symbol', symbol)
+        tables.append(table)
+
+    if not tables:
+        print("Aucun résultat")
+        return
+    results = pd.concat(tables, ignore_index=True)
+    with pd.option_context('display.width', 160, 'display.float_format', '{:.3f}'.format):
+        print(results.to_string(index=False))
+        print("\nMoyenne par backend :")
+        print(results.drop(columns='symbol').groupby('backend').mean().to_string())
+
+
+if __name__ == '__main__':
+    main()
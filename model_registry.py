@@ -0,0 +1,125 @@
+# model_registry.py
+import os
+import glob
+import time
+import threading
+from collections import OrderedDict
+import ccxt
+import joblib
+from ohlcv_store import DATA_DIR
+
+
+class ModelRegistry:
+    """
+    Registre des modèles entraînés (estimateur + scaler)
+    Clé : (symbole, timeframe, version des features, fin de la fenêtre d'entraînement)
+    Les modèles sont persistés sur disque avec joblib et gardés en mémoire (LRU)
+    """
+    def __init__(self, directory=None, max_models=32, staleness=3):
+        self.directory = directory or os.path.join(DATA_DIR, 'models')
+        self.max_models = max_models
+        self.staleness = staleness  # Nombre de nouvelles bougies toléré avant réentraînement
+        os.makedirs(self.directory, exist_ok=True)
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self._timings = {kind: {'count': 0, 'total': 0.0, 'last': 0.0}
+                         for kind in ('load', 'fit', 'predict')}
+
+    def _path(self, symbol, timeframe, version, window_end):
+        name = f"{symbol.replace('/', '-').replace(':', '-')}_{timeframe}_v{version}_{window_end}.joblib"
+        return os.path.join(self.directory, name)
+
+    def _pattern(self, symbol, timeframe, version):
+        return self._path(symbol, timeframe, version, '*')
+
+    def record(self, kind, seconds):
+        """Enregistre une latence (load, fit ou predict)"""
+        with self._lock:
+            timing = self._timings[kind]
+            timing['count'] += 1
+            timing['total'] += seconds
+            timing['last'] = seconds
+
+    def latency_stats(self):
+        """Latences moyennes et dernières, en millisecondes"""
+        with self._lock:
+            return {
+                kind: {
+                    'count': t['count'],
+                    'mean_ms': t['total'] / t['count'] * 1000 if t['count'] else 0.0,
+                    'last_ms': t['last'] * 1000
+                }
+                for kind, t in self._timings.items()
+            }
+
+    def get(self, symbol, timeframe, version, window_end):
+        """
+        Retourne (modèle, scaler) si un modèle suffisamment récent existe
+        window_end : horodatage (ms) de la dernière bougie disponible
+        """
+        key = (symbol, timeframe, version)
+        max_age = self.staleness * ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                self._models.move_to_end(key)
+
+        if entry is None:
+            entry = self._load_latest(symbol, timeframe, version)
+        if entry is None or window_end - entry[0] > max_age:
+            return None
+        return entry[1], entry[2]
+
+    def _load_latest(self, symbol, timeframe, version):
+        paths = glob.glob(self._pattern(symbol, timeframe, version))
+        if not paths:
+            return None
+        path = max(paths, key=lambda p: int(p.rsplit('_', 1)[1].split('.')[0]))
+        window_end = int(path.rsplit('_', 1)[1].split('.')[0])
+
+        start = time.perf_counter()
+        try:
+            model, scaler = joblib.load(path)
+        except Exception as e:
+            print(f"Modèle illisible {path}: {str(e)}")
+            return None
+        self.record('load', time.perf_counter() - start)
+
+        entry = (window_end, model, scaler)
+        self._remember((symbol, timeframe, version), entry)
+        return entry
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._models[key] = entry
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+    def put(self, symbol, timeframe, version, window_end, model, scaler):
+        """Enregistre un modèle et remplace les versions précédentes sur disque"""
+        path = self._path(symbol, timeframe, version, window_end)
+        old_paths = [p for p in glob.glob(self._pattern(symbol, timeframe, version)) if p != path]
+        try:
+            joblib.dump((model, scaler), path)
+            for old_path in old_paths:
+                os.remove(old_path)
+        except OSError as e:
+            print(f"Sauvegarde du modèle impossible: {str(e)}")
+        self._remember((symbol, timeframe, version), (window_end, model, scaler))
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_model_registry():
+    """
+    Retourne le registre partagé par toute l'application
+    """
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ModelRegistry()
+    return _default_registry
@@ -0,0 +1,234 @@
+# model_search.py
+"""
+Recherche d'hyperparamètres et de sous-ensembles de features pour AIPredictor
+
+Usage :
+    python model_search.py BTC/USDT ETH/USDT --timeframe 1h --limit 1500 --n-iter 30
+    python model_search.py BTC/USDT --grid
+
+Chaque configuration est évaluée par validation croisée temporelle sur un
+pool de processus. La matrice de features de chaque symbole est calculée une
+seule fois (FeatureStore) puis partagée par les workers en mémoire mappée.
+Le classement est écrit dans data/search et le meilleur modèle de chaque
+symbole est enregistré dans le registre de modèles.
+"""
+import os
+import json
+import time
+import argparse
+import ccxt
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import accuracy_score, precision_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, TimeSeriesSplit
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+from ai_predictor import AIPredictor
+from feature_store import get_feature_store
+from model_registry import get_model_registry
+from ohlcv_store import DATA_DIR
+from utils import get_exchange, fetch_ohlcv_dataframe
+
+# Colonnes de AIPredictor.compute_features, dans l'ordre
+FEATURE_NAMES = ['rsi', 'macd', 'volume_change', 'price_change',
+                 'ema9_trend', 'ema20_trend', 'volatility']
+
+FEATURE_SUBSETS = {
+    'all': FEATURE_NAMES,
+    'momentum': ['rsi', 'macd', 'price_change'],
+    'trend': ['ema9_trend', 'ema20_trend', 'price_change', 'volatility'],
+    'no_volume': [name for name in FEATURE_NAMES if name != 'volume_change']
+}
+
+SEARCH_SPACE = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [None, 3, 5, 8],
+    'horizon': [1, 3, 6],  # Nombre de bougies sur lequel la hausse est prédite
+    'features': list(FEATURE_SUBSETS)
+}
+
+# Version des modèles de la recherche dans le registre : l'horizon et les
+# features utilisées diffèrent du modèle par défaut de AIPredictor
+SEARCH_VERSION = f"{AIPredictor.FEATURE_SET_VERSION}search"
+
+SEARCH_DIR = os.path.join(DATA_DIR, 'search')
+
+
+def horizon_dataset(series, timeframe, horizon):
+    """
+    Lignes exploitables et labels (hausse à horizon bougies) d'une série du FeatureStore
+    Une ligne est gardée si ses features sont complètes et si la bougie
+    horizon bougies plus loin est bien présente
+    """
+    timestamps, close, features = series['timestamp'], series['close'], series['features']
+    n = len(timestamps) - horizon
+    if n <= 0:
+        return np.empty(0, dtype=int), np.empty(0, dtype=int)
+    timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+    valid = (timestamps[horizon:] - timestamps[:n] == horizon * timeframe_ms)
+    valid &= np.isfinite(features[:n]).all(axis=1)
+    rows = np.flatnonzero(valid)
+    return rows, (close[rows + horizon] > close[rows]).astype(int)
+
+
+def make_estimator(config):
+    """Classifieur correspondant à une configuration"""
+    return RandomForestClassifier(
+        n_estimators=config['n_estimators'],
+        max_depth=config['max_depth'],
+        random_state=0,
+        n_jobs=1  # Le parallélisme est assuré par le pool de la recherche
+    )
+
+
+def _evaluate_config(symbol, config, series, timeframe, n_splits):
+    """Score d'une configuration sur un symbole (exécuté dans un worker)"""
+    start = time.perf_counter()
+    rows, y = horizon_dataset(series, timeframe, config['horizon'])
+    columns = [FEATURE_NAMES.index(name) for name in FEATURE_SUBSETS[config['features']]]
+    X = np.asarray(series['features'])[rows][:, columns]
+
+    accuracies, precisions = [], []
+    # gap=horizon : aucun label d'entraînement ne chevauche la période de test
+    splitter = TimeSeriesSplit(n_splits=n_splits, gap=config['horizon'])
+    for train, test in splitter.split(X):
+        scaler = MinMaxScaler()
+        model = make_estimator(config).fit(scaler.fit_transform(X[train]), y[train])
+        predictions = model.predict(scaler.transform(X[test]))
+        accuracies.append(accuracy_score(y[test], predictions))
+        precisions.append(precision_score(y[test], predictions, zero_division=0))
+
+    return {
+        'symbol': symbol,
+        **config,
+        'score': float(np.mean(accuracies)),
+        'score_std': float(np.std(accuracies)),
+        'precision': float(np.mean(precisions)),
+        'samples': len(rows),
+        'wall_clock': time.perf_counter() - start
+    }
+
+
+def fit_best_model(series, timeframe, config):
+    """
+    Réentraîne la meilleure configuration sur tout l'historique
+    Retourne (modèle, scaler) au format du registre : le scaler porte sur
+    toutes les features, le pipeline ne garde que celles de la configuration
+    """
+    rows, y = horizon_dataset(series, timeframe, config['horizon'])
+    X = np.asarray(series['features'])[rows]
+    columns = [FEATURE_NAMES.index(name) for name in FEATURE_SUBSETS[config['features']]]
+
+    scaler = MinMaxScaler()
+    model = Pipeline([
+        ('select', ColumnTransformer([('features', 'passthrough', columns)])),
+        ('model', make_estimator(config))
+    ])
+    model.fit(scaler.fit_transform(X), y)
+    return model, scaler
+
+
+def search_configs(n_iter=20, grid=False, random_state=0):
+    """Configurations à évaluer : grille complète ou tirage aléatoire"""
+    if grid:
+        return list(ParameterGrid(SEARCH_SPACE))
+    return list(ParameterSampler(SEARCH_SPACE, n_iter=n_iter, random_state=random_state))
+
+
+def run_search(symbols, timeframe='1h', limit=1000, configs=None, n_splits=5,
+               n_jobs=-1, exchange=None, store=None, registry=None):
+    """
+    Évalue les configurations pour chaque symbole et enregistre le meilleur modèle
+    Retourne le classement (DataFrame trié par score décroissant)
+    """
+    exchange = exchange or get_exchange()
+    store = store or get_feature_store(AIPredictor.compute_features, AIPredictor.FEATURE_SET_VERSION)
+    registry = registry or get_model_registry()
+    configs = configs or search_configs()
+
+    datasets = {}
+    for symbol in symbols:
+        df = fetch_ohlcv_dataframe(exchange, symbol, timeframe, limit)
+        if df is None or len(df) < 2:
+            print(f"Données indisponibles pour {symbol}")
+            continue
+        store.update(symbol, timeframe, df)
+        start = int(df['timestamp'].iloc[0].value // 10**6)
+        series = store.get(symbol, timeframe, start=start)
+        if series is None or len(horizon_dataset(series, timeframe, 1)[0]) < 10 * n_splits:
+            print(f"Historique insuffisant pour {symbol}")
+            continue
+        datasets[symbol] = series
+
+    if not datasets:
+        return pd.DataFrame()
+
+    # max_nbytes=0 : chaque tableau est mappé en mémoire une seule fois et
+    # partagé par tous les workers au lieu d'être copié pour chaque tâche
+    results = Parallel(n_jobs=n_jobs, max_nbytes=0)(
+        delayed(_evaluate_config)(symbol, config, series, timeframe, n_splits)
+        for symbol, series in datasets.items()
+        for config in configs
+    )
+    leaderboard = pd.DataFrame(results).sort_values('score', ascending=False, ignore_index=True)
+
+    best_configs = {}
+    for symbol, rows in leaderboard.groupby('symbol', sort=False):
+        best = rows.iloc[0]
+        config = {key: best[key] for key in SEARCH_SPACE}
+        config['max_depth'] = None if pd.isna(config['max_depth']) else int(config['max_depth'])
+        config['n_estimators'] = int(config['n_estimators'])
+        config['horizon'] = int(config['horizon'])
+
+        series = datasets[symbol]
+        model, scaler = fit_best_model(series, timeframe, config)
+        window_end = int(series['timestamp'][-1])
+        registry.put(symbol, timeframe, SEARCH_VERSION, window_end, model, scaler)
+        best_configs[symbol] = {**config, 'score': float(best['score']), 'window_end': window_end}
+
+    save_results(leaderboard, best_configs, timeframe)
+    return leaderboard
+
+
+def save_results(leaderboard, best_configs, timeframe):
+    """Écrit le classement (CSV) et les meilleures configurations (JSON)"""
+    try:
+        os.makedirs(SEARCH_DIR, exist_ok=True)
+        leaderboard.to_csv(os.path.join(SEARCH_DIR, f"leaderboard_{timeframe}.csv"), index=False)
+        with open(os.path.join(SEARCH_DIR, f"best_{timeframe}.json"), 'w') as f:
+            json.dump(best_configs, f, indent=2)
+    except OSError as e:
+        print(f"Sauvegarde des résultats impossible: {str(e)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recherche d'hyperparamètres pour AIPredictor")
+    parser.add_argument('symbols', nargs='+', help="Symboles, ex. BTC/USDT")
+    parser.add_argument('--timeframe', default='1h')
+    parser.add_argument('--limit', type=int, default=1000, help="Nombre de bougies")
+    parser.add_argument('--n-iter', type=int, default=20, help="Configurations tirées au hasard")
+    parser.add_argument('--grid', action='store_true', help="Évaluer la grille complète")
+    parser.add_argument('--splits', type=int, default=5, help="Folds de validation temporelle")
+    parser.add_argument('--jobs', type=int, default=-1, help="Processus du pool")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    configs = search_configs(args.n_iter, args.grid, args.seed)
+    leaderboard = run_search(args.symbols, args.timeframe, args.limit, configs,
+                             args.splits, args.jobs)
+    if leaderboard.empty:
+        print("Aucun résultat")
+        return
+
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(leaderboard.head(20).to_string(index=False))
+    print(f"\n{len(leaderboard)} évaluations en {time.perf_counter() - start:.1f}s, "
+          f"résultats dans {SEARCH_DIR}")
+
+
+if __name__ == '__main__':
+    main()
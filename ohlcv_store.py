@@ -0,0 +1,144 @@
+# ohlcv_store.py
+import os
+import sqlite3
+import threading
+import time
+import ccxt
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+MAX_OHLCV_PAGE = 1500  # Nombre maximal de bougies renvoyées par KuCoin par requête
+
+
+def fetch_ohlcv_pages(exchange, symbol, timeframe, since, until=None, page_size=MAX_OHLCV_PAGE):
+    """
+    Génère les pages de bougies de since à until (ms, maintenant par défaut)
+    Une période sans bougie (symbole pas encore listé) est sautée
+    """
+    timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+    until = until or int(time.time() * 1000)
+    cursor = since
+    while cursor <= until:
+        page = exchange.fetch_ohlcv(symbol, timeframe, since=cursor, limit=page_size)
+        page = [candle for candle in page if cursor <= candle[0] <= until]
+        if page:
+            yield page
+            cursor = page[-1][0] + timeframe_ms
+        else:
+            cursor += page_size * timeframe_ms
+
+
+class OHLCVStore:
+    """
+    Stockage local des bougies (SQLite), conservé entre les redémarrages
+    Une partition par couple (symbole, timeframe) : la clé primaire
+    regroupe physiquement les bougies de chaque série
+    """
+    def __init__(self, path=None):
+        self.path = path or os.path.join(DATA_DIR, 'ohlcv.sqlite')
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS ohlcv (
+                symbol TEXT NOT NULL,
+                timeframe TEXT NOT NULL,
+                timestamp INTEGER NOT NULL,
+                open REAL, high REAL, low REAL, close REAL, volume REAL,
+                PRIMARY KEY (symbol, timeframe, timestamp)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    def last_timestamp(self, symbol, timeframe):
+        """Horodatage (ms) de la dernière bougie stockée, None si vide"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(timestamp) FROM ohlcv WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe)
+            ).fetchone()
+        return row[0]
+
+    def count(self, symbol, timeframe, since=None):
+        """Nombre de bougies stockées, depuis since (ms) si fourni"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) FROM ohlcv WHERE symbol = ? AND timeframe = ? AND timestamp >= ?",
+                (symbol, timeframe, since or 0)
+            ).fetchone()
+        return row[0]
+
+    def append(self, symbol, timeframe, ohlcv):
+        """
+        Ajoute des bougies au format ccxt [timestamp, o, h, l, c, v]
+        Une bougie déjà présente est remplacée (bougie en cours mise à jour)
+        """
+        if not ohlcv:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ohlcv VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(symbol, timeframe, int(c[0]), c[1], c[2], c[3], c[4], c[5]) for c in ohlcv]
+            )
+            self._conn.commit()
+
+    def load(self, symbol, timeframe, limit=None, since=None):
+        """Retourne les dernières bougies stockées sous forme de DataFrame"""
+        query = ("SELECT timestamp, open, high, low, close, volume FROM ohlcv "
+                 "WHERE symbol = ? AND timeframe = ? AND timestamp >= ? "
+                 "ORDER BY timestamp DESC")
+        params = [symbol, timeframe, since or 0]
+        if limit:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        df = pd.DataFrame(rows[::-1], columns=OHLCV_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        return df
+
+    def get_ohlcv(self, exchange, symbol, timeframe='1h', limit=100):
+        """
+        Retourne les limit dernières bougies en ne téléchargeant que
+        celles clôturées depuis la dernière bougie stockée
+        """
+        timeframe_ms = ccxt.Exchange.parse_timeframe(timeframe) * 1000
+        now = int(time.time() * 1000)
+        window_start = now - limit * timeframe_ms
+        last = self.last_timestamp(symbol, timeframe)
+
+        # Historique local incomplet sur la fenêtre demandée : téléchargement complet
+        full = (last is None or last < window_start or
+                self.count(symbol, timeframe, window_start) < (last - window_start) // timeframe_ms)
+        # Sinon, la dernière bougie stockée était peut-être encore ouverte
+        since = window_start if full else last
+        missing = limit if full else (now - last) // timeframe_ms + 1
+
+        if missing > MAX_OHLCV_PAGE:
+            # Au-delà d'une requête : téléchargement page par page
+            for page in fetch_ohlcv_pages(exchange, symbol, timeframe, since, now):
+                self.append(symbol, timeframe, page)
+        elif full:
+            self.append(symbol, timeframe, exchange.fetch_ohlcv(symbol, timeframe, limit=limit))
+        else:
+            self.append(symbol, timeframe,
+                        exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=int(missing)))
+        return self.load(symbol, timeframe, limit=limit)
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_ohlcv_store():
+    """
+    Retourne le stockage partagé par toute l'application
+    """
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = OHLCVStore()
+    return _default_store
@@ -0,0 +1,161 @@
+# panel_indicators.py
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Toutes les fonctions travaillent sur des panels 2-D (symboles × bougies),
+# la dernière colonne étant la bougie la plus récente. Les valeurs non
+# disponibles (historique trop court) valent NaN, comme avec pandas/ta.
+
+
+def build_panel(frames, length=None):
+    """
+    Construit un panel à partir d'un dict {symbole: DataFrame OHLCV}
+    Les séries sont alignées sur leurs length dernières bougies,
+    les séries plus courtes sont écartées
+    """
+    frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+    if not frames:
+        return [], {}
+    if length is None:
+        length = min(len(df) for df in frames.values())
+
+    symbols = [s for s, df in frames.items() if len(df) >= length]
+    panel = {
+        column: np.array([frames[s][column].to_numpy(dtype=float)[-length:] for s in symbols])
+        for column in ['open', 'high', 'low', 'close', 'volume']
+    }
+    return symbols, panel
+
+
+def _rolling(values, window, func):
+    """Applique func sur une fenêtre glissante le long des bougies"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[1] >= window:
+        out[:, window - 1:] = func(sliding_window_view(values, window, axis=1), axis=-1)
+    return out
+
+
+def rolling_mean(values, window):
+    return _rolling(values, window, np.mean)
+
+
+def rolling_min(values, window):
+    return _rolling(values, window, np.min)
+
+
+def rolling_max(values, window):
+    return _rolling(values, window, np.max)
+
+
+def rolling_std(values, window):
+    """Écart-type glissant (ddof=1, comme pandas)"""
+    return _rolling(values, window, lambda w, axis: np.std(w, axis=axis, ddof=1))
+
+
+def pct_change(values):
+    """Variation relative d'une bougie à l'autre (NaN pour la première)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.diff(values, axis=1, prepend=np.nan) / np.roll(values, 1, axis=1)
+
+
+def ewm(values, alpha, min_periods=0):
+    """
+    Moyenne exponentielle (adjust=False) de chaque ligne
+    Les NaN initiaux sont ignorés, comme avec pandas
+    """
+    out = np.full(values.shape, np.nan)
+    state = np.full(values.shape[0], np.nan)
+    count = np.zeros(values.shape[0], dtype=int)
+    for t in range(values.shape[1]):
+        x = values[:, t]
+        valid = ~np.isnan(x)
+        started = ~np.isnan(state)
+        state = np.where(valid & started, state + alpha * (x - state), state)
+        state = np.where(valid & ~started, x, state)
+        count += valid
+        out[:, t] = np.where(count >= max(min_periods, 1), state, np.nan)
+    return out
+
+
+def ema(close, window):
+    """EMA de chaque ligne (équivalente à ta.trend.ema_indicator)"""
+    return ewm(close, 2 / (window + 1), min_periods=window)
+
+
+def _gains_losses(close):
+    delta = np.diff(close, axis=1, prepend=np.nan)
+    # Comme pandas .where : le premier écart (NaN) compte pour 0
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    return gain, loss
+
+
+def rsi(close, window=14):
+    """RSI de Wilder de chaque ligne (équivalent à ta.momentum.rsi)"""
+    gain, loss = _gains_losses(close)
+    avg_gain = ewm(gain, 1 / window, min_periods=window)
+    avg_loss = ewm(loss, 1 / window, min_periods=window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    return np.where(np.isnan(avg_loss), np.nan, out)
+
+
+def rsi_sma(close, window=14):
+    """RSI à moyennes simples (équivalent à TechnicalAnalysis.calculate_rsi)"""
+    gain, loss = _gains_losses(close)
+    avg_gain = rolling_mean(gain, window)
+    avg_loss = rolling_mean(loss, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def macd_diff(close, fast=12, slow=26, signal=9):
+    """Histogramme MACD de chaque ligne (équivalent à ta.trend.macd_diff)"""
+    macd = ema(close, fast) - ema(close, slow)
+    return macd - ewm(macd, 2 / (signal + 1), min_periods=signal)
+
+
+def compute_panel_indicators(close, high, low, volume, window=20):
+    """
+    Calcule en une passe les indicateurs de tous les symboles du panel
+    """
+    volume_sma = rolling_mean(volume, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = volume / volume_sma
+    return {
+        'rsi': rsi(close),
+        'rsi_sma': rsi_sma(close),
+        'ema9': ema(close, 9),
+        'ema20': ema(close, 20),
+        'ema50': ema(close, 50),
+        'macd_diff': macd_diff(close),
+        'support': rolling_min(low, window),
+        'resistance': rolling_max(high, window),
+        'volume_sma': volume_sma,
+        'volume_ratio': volume_ratio
+    }
+
+
+def local_extrema(values, window=14):
+    """
+    Détecte les extremums locaux le long de la dernière dimension
+    1 si le point central de la fenêtre est son maximum, -1 si minimum,
+    0 sinon, NaN aux bords ou si la fenêtre contient un NaN.
+    Même alignement que pandas rolling(window, center=True)
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < window:
+        return out
+
+    windows = sliding_window_view(values, window, axis=-1)
+    middle = windows[..., window // 2]
+    with np.errstate(invalid='ignore'):
+        codes = np.where(middle == windows.max(axis=-1), 1.0,
+                         np.where(middle == windows.min(axis=-1), -1.0, 0.0))
+    codes[np.isnan(windows).any(axis=-1)] = np.nan
+
+    # Le résultat est placé sur le point central de chaque fenêtre
+    start = window // 2
+    out[..., start:start + codes.shape[-1]] = codes
+    return out
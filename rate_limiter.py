@@ -0,0 +1,97 @@
+# rate_limiter.py
+import time
+import threading
+
+
+class TokenBucket:
+    """
+    Limiteur de débit à jetons, partagé entre threads
+    Chaque requête consomme un nombre de jetons égal à son poids
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate              # Jetons regagnés par seconde
+        self.capacity = capacity      # Rafale maximale
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.throttled_requests = 0
+        self.throttled_seconds = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, weight=1):
+        """
+        Réserve les jetons et bloque seulement si le budget est épuisé
+        Retourne le temps d'attente en secondes
+        """
+        weight = min(weight, self.capacity)
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (weight - self._tokens) / self.rate)
+            # Solde négatif = jetons réservés par les appelants en attente
+            self._tokens -= weight
+            self.requests += 1
+            if wait > 0:
+                self.throttled_requests += 1
+                self.throttled_seconds += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self):
+        """Statistiques d'utilisation du limiteur"""
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'throttled_requests': self.throttled_requests,
+                'throttled_seconds': self.throttled_seconds
+            }
+
+
+class RateLimitedExchange:
+    """
+    Enveloppe un exchange ccxt : chaque appel API passe par le token bucket
+    Les autres attributs sont délégués tels quels à l'exchange
+    """
+    # Poids KuCoin du pool public (2000 / 30 s)
+    DEFAULT_WEIGHTS = {
+        'fetch_ticker': 2,
+        'fetch_tickers': 15,
+        'fetch_ohlcv': 3,
+        'fetch_order_book': 2,
+        'fetch_trades': 3,
+        'fetch_markets': 4,
+        'fetch_currencies': 3
+    }
+
+    def __init__(self, exchange, limiter=None, weights=None):
+        self._exchange = exchange
+        self.limiter = limiter or TokenBucket(rate=2000 / 30, capacity=200)
+        self.weights = dict(self.DEFAULT_WEIGHTS, **(weights or {}))
+
+    def __getattr__(self, name):
+        attr = getattr(self._exchange, name)
+        weight = self.weights.get(name)
+        if weight is None or not callable(attr):
+            return attr
+
+        def limited(*args, **kwargs):
+            self.limiter.acquire(weight)
+            return attr(*args, **kwargs)
+        return limited
+
+    def load_markets(self, reload=False, params={}):
+        """Ne consomme des jetons que si les marchés doivent être téléchargés"""
+        if reload or not self._exchange.markets:
+            self.limiter.acquire(self.weights['fetch_markets'] + self.weights['fetch_currencies'])
+        return self._exchange.load_markets(reload, params)
+
+    def throttle_stats(self):
+        """Temps passé à attendre le limiteur"""
+        return self.limiter.stats()
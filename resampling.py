@@ -0,0 +1,75 @@
+# resampling.py
+import ccxt
+import numpy as np
+import pandas as pd
+from candle_cache import WEEK_OFFSET
+from ohlcv_store import OHLCV_COLUMNS
+from utils import fetch_ohlcv_dataframe
+
+
+def timeframe_ms(timeframe):
+    """Durée d'une bougie en millisecondes"""
+    return ccxt.Exchange.parse_timeframe(timeframe) * 1000
+
+
+def resample_ohlcv(df, timeframe):
+    """
+    Agrège une série OHLCV fine vers un timeframe supérieur (jusqu'à 1w)
+    Les bougies sont alignées comme sur l'exchange (UTC, lundi pour 1w) ;
+    la première bougie, incomplète si la série démarre en cours de période,
+    est écartée. La dernière reste ouverte, comme celle de l'exchange.
+    Retourne None si la série est plus grossière que le timeframe demandé
+    """
+    if df is None or df.empty:
+        return df
+
+    duration = timeframe_ms(timeframe)
+    offset = WEEK_OFFSET * 1000 if timeframe.endswith('w') else 0
+    timestamps = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+    if len(timestamps) > 1 and np.diff(timestamps).min() > duration:
+        return None
+
+    buckets = (timestamps - offset) // duration
+    starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+    ends = np.append(starts[1:], len(buckets)) - 1
+
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    volume = df['volume'].to_numpy(dtype=float)
+    bucket_start = buckets[starts] * duration + offset
+    resampled = pd.DataFrame({
+        'timestamp': pd.to_datetime(bucket_start, unit='ms'),
+        'open': df['open'].to_numpy(dtype=float)[starts],
+        'high': np.maximum.reduceat(high, starts),
+        'low': np.minimum.reduceat(low, starts),
+        'close': df['close'].to_numpy(dtype=float)[ends],
+        'volume': np.add.reduceat(volume, starts)
+    }, columns=OHLCV_COLUMNS)
+
+    if timestamps[0] != bucket_start[0]:
+        resampled = resampled.iloc[1:].reset_index(drop=True)
+    return resampled
+
+
+def fetch_timeframes(exchange, symbol, timeframes, limit=100, base_timeframe='1h'):
+    """
+    Retourne {timeframe: DataFrame} des limit dernières bougies de chaque timeframe
+    Une seule série de base est téléchargée, les timeframes supérieurs en sont
+    dérivés localement ; les timeframes plus fins que la base sont téléchargés
+    """
+    base_duration = timeframe_ms(base_timeframe)
+    derived = [tf for tf in timeframes if timeframe_ms(tf) >= base_duration]
+
+    frames = {}
+    if derived:
+        # Une bougie de plus pour compenser la première période incomplète
+        ratio = max(timeframe_ms(tf) // base_duration for tf in derived)
+        base = fetch_ohlcv_dataframe(exchange, symbol, base_timeframe, (limit + 1) * ratio)
+        for tf in derived:
+            resampled = resample_ohlcv(base, tf)
+            frames[tf] = None if resampled is None else resampled.tail(limit).reset_index(drop=True)
+
+    for tf in timeframes:
+        if tf not in frames:
+            frames[tf] = fetch_ohlcv_dataframe(exchange, symbol, tf, limit)
+    return frames
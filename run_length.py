@@ -0,0 +1,78 @@
+# run_length.py
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Séries de bougies consécutives (vertes, rouges...) calculées sans boucle
+# Python. Comme panel_indicators, les fonctions travaillent sur des panels
+# 2-D (symboles × bougies) ; une série seule est un panel d'une ligne.
+
+
+def run_lengths(mask):
+    """
+    Longueur de la série de True qui se termine sur chaque bougie
+    (0 si la bougie ne vérifie pas la condition)
+    """
+    mask = np.atleast_2d(np.asarray(mask, dtype=bool))
+    positions = np.arange(mask.shape[1])
+    # Position du dernier False rencontré, -1 s'il n'y en a pas encore
+    last_break = np.maximum.accumulate(np.where(mask, -1, positions), axis=1)
+    return positions - last_break
+
+
+def rolling_count(mask, window):
+    """Nombre de True sur les window dernières bougies (fenêtre partielle au début)"""
+    mask = np.atleast_2d(np.asarray(mask, dtype=bool))
+    counts = np.cumsum(mask, axis=1)
+    counts[:, window:] -= counts[:, :-window]
+    return counts
+
+
+def rolling_longest_run(mask, window):
+    """Plus longue série de True contenue dans les window dernières bougies"""
+    runs = run_lengths(mask)
+    padded = np.pad(runs, ((0, 0), (window - 1, 0)))
+    windows = sliding_window_view(padded, window, axis=1)
+    # Une série ne compte que pour sa partie située dans la fenêtre
+    return np.minimum(windows, np.arange(1, window + 1)).max(axis=-1)
+
+
+def candle_runs(open_, close, window=5):
+    """
+    Caractéristiques de séries de chaque bougie de chaque symbole
+    Retourne un dict de tableaux 2-D :
+    green_streak / red_streak : bougies vertes / rouges consécutives
+    longest_green : plus longue série verte sur les window dernières bougies
+    green_count / green_ratio : bougies vertes sur les window dernières bougies
+    """
+    open_ = np.atleast_2d(np.asarray(open_, dtype=float))
+    close = np.atleast_2d(np.asarray(close, dtype=float))
+    green = close > open_
+    red = close < open_
+
+    green_count = rolling_count(green, window)
+    available = np.minimum(np.arange(1, green.shape[1] + 1), window)
+    return {
+        'green_streak': run_lengths(green),
+        'red_streak': run_lengths(red),
+        'longest_green': rolling_longest_run(green, window),
+        'green_count': green_count,
+        'green_ratio': green_count / available
+    }
+
+
+def panel_runs(panel, window=5):
+    """Séries de toutes les bougies d'un panel (voir panel_indicators.build_panel)"""
+    return candle_runs(panel['open'], panel['close'], window)
+
+
+def green_candle_stats(df, window=5):
+    """
+    Bougies vertes parmi les window dernières bougies d'un DataFrame, et
+    bougies vertes consécutives jusqu'à la dernière (au plus window)
+    Retourne (bougies vertes, bougies vertes consécutives)
+    """
+    if df is None or df.empty:
+        return 0, 0
+    # Seules les window dernières bougies comptent : la série est bornée d'office
+    green = df['close'].to_numpy()[-window:] > df['open'].to_numpy()[-window:]
+    return int(green.sum()), int(run_lengths(green)[0, -1])
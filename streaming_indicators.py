@@ -0,0 +1,285 @@
+# streaming_indicators.py
+from collections import deque
+import sqlite3
+import threading
+from ohlcv_store import get_ohlcv_store
+
+
+class StreamingEMA:
+    """EMA incrémentale (équivalente à ta.trend.ema_indicator)"""
+    def __init__(self, window):
+        self.window = window
+        self.alpha = 2 / (window + 1)
+        self.count = 0
+        self._value = None
+
+    def update(self, x):
+        if self._value is None:
+            self._value = x
+        else:
+            self._value += self.alpha * (x - self._value)
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        return self._value if self.count >= self.window else None
+
+
+class StreamingRSI:
+    """RSI de Wilder incrémental (équivalent à ta.momentum.rsi)"""
+    def __init__(self, window=14):
+        self.window = window
+        self.count = 0
+        self._prev_close = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def update(self, close):
+        if self._prev_close is not None:
+            delta = close - self._prev_close
+            self._avg_gain += (max(delta, 0.0) - self._avg_gain) / self.window
+            self._avg_loss += (max(-delta, 0.0) - self._avg_loss) / self.window
+        self._prev_close = close
+        self.count += 1
+        return self.value
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return None
+        if self._avg_loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + self._avg_gain / self._avg_loss)
+
+
+class StreamingMACD:
+    """MACD incrémental : ligne, signal et histogramme (macd_diff)"""
+    def __init__(self, fast=12, slow=26, signal=9):
+        self.fast = StreamingEMA(fast)
+        self.slow = StreamingEMA(slow)
+        self.signal = StreamingEMA(signal)
+        self.macd = None
+
+    def update(self, close):
+        fast = self.fast.update(close)
+        slow = self.slow.update(close)
+        if fast is not None and slow is not None:
+            self.macd = fast - slow
+            self.signal.update(self.macd)
+        return self.diff
+
+    @property
+    def diff(self):
+        signal = self.signal.value
+        return None if signal is None else self.macd - signal
+
+
+class StreamingStochastic:
+    """%K stochastique incrémental (équivalent à ta.momentum.stoch)"""
+    def __init__(self, window=14):
+        self.window = window
+        self.count = 0
+        self.value = None
+        # Files monotones (index, valeur) : min/max glissants en O(1) amorti
+        self._lows = deque()
+        self._highs = deque()
+
+    def update(self, high, low, close):
+        i = self.count
+        while self._lows and self._lows[-1][1] >= low:
+            self._lows.pop()
+        self._lows.append((i, low))
+        while self._highs and self._highs[-1][1] <= high:
+            self._highs.pop()
+        self._highs.append((i, high))
+        while self._lows[0][0] <= i - self.window:
+            self._lows.popleft()
+        while self._highs[0][0] <= i - self.window:
+            self._highs.popleft()
+        self.count += 1
+
+        if self.count >= self.window:
+            lowest, highest = self._lows[0][1], self._highs[0][1]
+            self.value = 100 * (close - lowest) / (highest - lowest) if highest != lowest else None
+        return self.value
+
+
+class StreamingADX:
+    """ADX de Wilder incrémental"""
+    def __init__(self, window=14):
+        self.window = window
+        self.count = 0
+        self.value = None
+        self._prev = None       # (high, low, close) de la bougie précédente
+        self._tr = 0.0
+        self._plus_dm = 0.0
+        self._minus_dm = 0.0
+        self._dx_sum = 0.0
+        self._dx_count = 0
+
+    def update(self, high, low, close):
+        if self._prev is not None:
+            prev_high, prev_low, prev_close = self._prev
+            tr = max(high, prev_close) - min(low, prev_close)
+            up, down = high - prev_high, prev_low - low
+            plus_dm = up if up > down and up > 0 else 0.0
+            minus_dm = down if down > up and down > 0 else 0.0
+
+            n = self.window
+            self.count += 1
+            if self.count <= n:
+                # Amorçage : somme des n premières valeurs
+                self._tr += tr
+                self._plus_dm += plus_dm
+                self._minus_dm += minus_dm
+            else:
+                self._tr += tr - self._tr / n
+                self._plus_dm += plus_dm - self._plus_dm / n
+                self._minus_dm += minus_dm - self._minus_dm / n
+
+            if self.count >= n and self._tr > 0:
+                plus_di = 100 * self._plus_dm / self._tr
+                minus_di = 100 * self._minus_dm / self._tr
+                di_sum = plus_di + minus_di
+                dx = 100 * abs(plus_di - minus_di) / di_sum if di_sum else 0.0
+                if self._dx_count < n:
+                    self._dx_sum += dx
+                    self._dx_count += 1
+                    if self._dx_count == n:
+                        self.value = self._dx_sum / n
+                else:
+                    self.value = (self.value * (n - 1) + dx) / n
+
+        self._prev = (high, low, close)
+        return self.value
+
+
+class StreamingIndicators:
+    """
+    État incrémental de tous les indicateurs d'une série
+    Chaque nouvelle bougie clôturée coûte O(1)
+    """
+    def __init__(self):
+        self.rsi = StreamingRSI(14)
+        self.ema9 = StreamingEMA(9)
+        self.ema20 = StreamingEMA(20)
+        self.ema50 = StreamingEMA(50)
+        self.macd = StreamingMACD()
+        self.stoch = StreamingStochastic(14)
+        self.adx = StreamingADX(14)
+        self.last_timestamp = None
+        self.close = None
+        self.lock = threading.Lock()
+
+    def update(self, timestamp, open_, high, low, close, volume=None):
+        """
+        Intègre une bougie clôturée
+        Les bougies déjà intégrées (timestamp <= dernier) sont ignorées
+        """
+        if self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return self.values()
+
+        self.rsi.update(close)
+        self.ema9.update(close)
+        self.ema20.update(close)
+        self.ema50.update(close)
+        self.macd.update(close)
+        self.stoch.update(high, low, close)
+        self.adx.update(high, low, close)
+        self.last_timestamp = timestamp
+        self.close = close
+        return self.values()
+
+    def values(self):
+        """Valeurs courantes des indicateurs (None tant que non disponibles)"""
+        return {
+            'timestamp': self.last_timestamp,
+            'close': self.close,
+            'rsi': self.rsi.value,
+            'ema9': self.ema9.value,
+            'ema20': self.ema20.value,
+            'ema50': self.ema50.value,
+            'macd': self.macd.macd,
+            'macd_diff': self.macd.diff,
+            'stoch': self.stoch.value,
+            'adx': self.adx.value
+        }
+
+
+class IndicatorEngine:
+    """
+    Moteur d'indicateurs incrémentaux, un état par (symbole, timeframe)
+    """
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+
+    def _state(self, symbol, timeframe):
+        with self._lock:
+            key = (symbol, timeframe)
+            if key not in self._states:
+                self._states[key] = StreamingIndicators()
+            return self._states[key]
+
+    @staticmethod
+    def _integrate(state, df):
+        """Intègre les bougies de df postérieures à la dernière intégrée"""
+        if state.last_timestamp is not None:
+            df = df.iloc[df['timestamp'].searchsorted(state.last_timestamp, side='right'):]
+        if df.empty:
+            return
+        columns = [df['timestamp'], df['open'], df['high'], df['low'], df['close'], df['volume']]
+        for candle in zip(*(column.tolist() for column in columns)):
+            state.update(*candle)
+
+    def seed(self, symbol, timeframe, df):
+        """
+        Initialise l'état depuis un historique (DataFrame OHLCV)
+        Les bougies déjà intégrées sont ignorées
+        """
+        state = self._state(symbol, timeframe)
+        with state.lock:
+            self._integrate(state, df)
+            return state.values()
+
+    def sync(self, symbol, timeframe, df, store=None):
+        """
+        Met l'état à jour avec les bougies clôturées de df (la dernière
+        bougie, encore ouverte, est ignorée) et retourne les valeurs courantes
+        Au premier appel, l'état est amorcé depuis tout l'historique du
+        stockage local ; ensuite seules les nouvelles bougies sont intégrées
+        """
+        state = self._state(symbol, timeframe)
+        with state.lock:
+            if state.last_timestamp is None:
+                try:
+                    history = (store or get_ohlcv_store()).load(symbol, timeframe)
+                    self._integrate(state, history.iloc[:-1])
+                except sqlite3.Error as e:
+                    print(f"Historique local indisponible pour {symbol}: {str(e)}")
+            self._integrate(state, df.iloc[:-1])
+            return state.values()
+
+    def update(self, symbol, timeframe, candle):
+        """Intègre une bougie clôturée [timestamp, open, high, low, close, volume]"""
+        return self._state(symbol, timeframe).update(*candle)
+
+    def values(self, symbol, timeframe):
+        """Valeurs courantes, None si la série n'a jamais été initialisée"""
+        state = self._states.get((symbol, timeframe))
+        return state.values() if state else None
+
+    def reset(self, symbol, timeframe):
+        with self._lock:
+            self._states.pop((symbol, timeframe), None)
+
+
+_default_engine = IndicatorEngine()
+
+
+def get_indicator_engine():
+    """
+    Retourne le moteur d'indicateurs partagé par toute l'application
+    """
+    return _default_engine
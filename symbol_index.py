@@ -0,0 +1,224 @@
+# symbol_index.py
+import os
+import json
+import time
+import threading
+import streamlit as st
+from ohlcv_store import DATA_DIR
+
+MARKETS_DIR = os.path.join(DATA_DIR, 'markets')
+# Âge (s) au-delà duquel l'instantané est rafraîchi en arrière-plan
+MARKETS_MAX_AGE = float(os.environ.get('MARKETS_MAX_AGE', 6 * 3600))
+# Délai (s) avant un nouvel essai après un rafraîchissement échoué
+MARKETS_RETRY_DELAY = 60
+
+# Fonctions appelées avec les nouveaux marchés après chaque rafraîchissement
+_refresh_listeners = []
+# Par exchange : horodatage des marchés chargés, dernier essai de
+# rafraîchissement et rafraîchissement en cours
+_markets_state = {}
+_markets_lock = threading.Lock()
+
+
+def _snapshot_path(exchange_id):
+    return os.path.join(MARKETS_DIR, f"{exchange_id}.json")
+
+
+def load_markets_snapshot(exchange_id):
+    """
+    Lit le dernier instantané des marchés sauvegardé sur disque
+    Retourne (marchés, devises, horodatage), (None, None, None) s'il n'existe pas
+    """
+    try:
+        with open(_snapshot_path(exchange_id)) as f:
+            snapshot = json.load(f)
+        return snapshot['markets'], snapshot.get('currencies'), snapshot['timestamp']
+    except (OSError, ValueError, KeyError):
+        return None, None, None
+
+
+def save_markets_snapshot(exchange_id, markets, currencies=None):
+    """Sauvegarde l'instantané des marchés (écriture atomique)"""
+    path = _snapshot_path(exchange_id)
+    try:
+        os.makedirs(MARKETS_DIR, exist_ok=True)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump({'timestamp': time.time(), 'markets': markets, 'currencies': currencies},
+                      f, default=str)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        print(f"Sauvegarde des marchés impossible: {str(e)}")
+
+
+def refresh_markets(exchange):
+    """Recharge les marchés depuis l'exchange et met à jour l'instantané disque"""
+    try:
+        markets = exchange.load_markets(reload=True)
+        save_markets_snapshot(exchange.id, markets, exchange.currencies)
+    except Exception as e:
+        print(f"Rafraîchissement des marchés impossible: {str(e)}")
+        return
+    _set_markets_timestamp(exchange.id, time.time())
+    for listener in list(_refresh_listeners):
+        listener(markets)
+
+
+def _set_markets_timestamp(exchange_id, timestamp):
+    with _markets_lock:
+        state = _markets_state.setdefault(exchange_id, {'attempt': 0.0, 'running': False})
+        state['timestamp'] = timestamp
+
+
+def refresh_if_stale(exchange, max_age=MARKETS_MAX_AGE):
+    """
+    Rafraîchit les marchés en arrière-plan s'ils ont plus de max_age secondes
+    Un seul rafraîchissement à la fois, au plus un essai toutes les
+    MARKETS_RETRY_DELAY secondes ; vérification sans appel réseau
+    Retourne True si un rafraîchissement a été lancé
+    """
+    now = time.time()
+    with _markets_lock:
+        state = _markets_state.get(exchange.id)
+        if (state is None or state['running'] or now - state['timestamp'] <= max_age
+                or now - state['attempt'] < MARKETS_RETRY_DELAY):
+            return False
+        state['running'] = True
+        state['attempt'] = now
+
+    def refresh():
+        try:
+            refresh_markets(exchange)
+        finally:
+            with _markets_lock:
+                state['running'] = False
+
+    threading.Thread(target=refresh, daemon=True).start()
+    return True
+
+
+def restore_markets(exchange, max_age=MARKETS_MAX_AGE):
+    """
+    Charge les marchés depuis l'instantané disque, sans appel réseau
+    L'instantané est rafraîchi en arrière-plan s'il a plus de max_age
+    secondes ; sans instantané, le chargement est synchrone
+    Retourne l'âge (s) de l'instantané utilisé, None sans instantané
+    """
+    markets, currencies, timestamp = load_markets_snapshot(exchange.id)
+    if markets is None:
+        refresh_markets(exchange)
+        return None
+
+    exchange.set_markets(markets, currencies)
+    _set_markets_timestamp(exchange.id, timestamp)
+    refresh_if_stale(exchange, max_age)
+    return time.time() - timestamp
+
+
+class _TrieNode:
+    __slots__ = ('children', 'terminal')
+
+    def __init__(self):
+        self.children = {}
+        self.terminal = False
+
+
+class SymbolIndex:
+    """
+    Index des symboles de l'exchange
+    Table de hachage actif de base -> paires canoniques (spot et perpétuel)
+    en USDT, et arbre de préfixes pour la saisie semi-automatique
+    """
+    QUOTE = 'USDT'
+
+    def __init__(self, markets=None):
+        self.rebuild(markets or {})
+
+    def rebuild(self, markets):
+        """Reconstruit l'index ; l'ancien reste utilisable jusqu'au remplacement"""
+        pairs = {}
+        for symbol, market in markets.items():
+            if market.get('quote') != self.QUOTE:
+                continue
+            kind = 'spot' if market.get('spot') else 'perp' if market.get('swap') else None
+            if kind:
+                pairs.setdefault(market['base'], {})[kind] = symbol
+
+        trie = _TrieNode()
+        for base in pairs:
+            node = trie
+            for char in base:
+                node = node.children.setdefault(char, _TrieNode())
+            node.terminal = True
+
+        # Remplacement en une seule affectation : les lectures concurrentes
+        # voient l'ancien ou le nouvel index, jamais un mélange
+        self._state = (pairs, frozenset(markets), trie)
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def pairs(self, base):
+        """Paires {'spot': ..., 'perp': ...} d'un actif, dict vide si inconnu"""
+        return dict(self._state[0].get(base.upper().strip(), {}))
+
+    def resolve(self, symbol):
+        """
+        Paire canonique d'un actif (spot en priorité, sinon perpétuel)
+        Un symbole complet connu de l'exchange est renvoyé tel quel
+        Retourne None si le symbole est inconnu
+        """
+        pairs, symbols, _ = self._state
+        symbol = symbol.upper().strip()
+        found = pairs.get(symbol)
+        if found:
+            return found.get('spot') or found.get('perp')
+        return symbol if symbol in symbols else None
+
+    def search(self, prefix, limit=10):
+        """Actifs commençant par prefix, par ordre alphabétique"""
+        node = self._state[2]
+        prefix = prefix.upper().strip()
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        results = []
+        stack = [(prefix, node)]
+        while stack and len(results) < limit:
+            base, node = stack.pop()
+            if node.terminal:
+                results.append(base)
+            # Ordre inverse sur la pile : les enfants sont dépilés alphabétiquement
+            for char in sorted(node.children, reverse=True):
+                stack.append((base + char, node.children[char]))
+        return results
+
+
+@st.cache_resource
+def _shared_symbol_index(_exchange):
+    """Index partagé, reconstruit à chaque rafraîchissement des marchés"""
+    if not _exchange.markets:
+        restore_markets(_exchange)
+    index = SymbolIndex(_exchange.markets)
+    _refresh_listeners.append(index.rebuild)
+    return index
+
+
+def get_symbol_index(exchange):
+    """
+    Retourne l'index des symboles partagé par toutes les pages
+    Construit depuis les marchés déjà chargés (instantané disque, voir
+    get_exchange) ; tant qu'il est vide (premier chargement échoué), les
+    marchés sont rechargés à chaque accès, ou repris s'ils ont été chargés
+    entre-temps par ccxt. L'âge des marchés est vérifié à chaque accès : au-delà
+    de MARKETS_MAX_AGE, ils sont rafraîchis en arrière-plan
+    """
+    index = _shared_symbol_index(exchange)
+    if not len(index):
+        if not exchange.markets:
+            refresh_markets(exchange)
+        if exchange.markets:
+            index.rebuild(exchange.markets)
+    refresh_if_stale(exchange)
+    return index
@@ -1,55 +1,185 @@
 # indicators.py
+import threading
+import weakref
 import pandas as pd
 import numpy as np
 import ta
+from panel_indicators import build_panel, compute_panel_indicators, local_extrema
+from candlestick_patterns import PATTERNS, frame_patterns
+from volume_levels import price_levels
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def ohlcv_arrays(df):
+    """
+    Vues NumPy des colonnes OHLCV d'un DataFrame, sans copie
+    Les tableaux partagent la mémoire du DataFrame : lecture seule
+    """
+    return {column: df[column].to_numpy(copy=False) for column in OHLCV_FIELDS}
+
+
+class IndicatorContext:
+    """
+    Indicateurs d'un DataFrame OHLCV, chacun calculé au plus une fois
+    Un contexte par DataFrame (libéré avec lui), invalidé dès que la
+    dernière bougie change. Les séries renvoyées sont partagées : lecture seule
+    """
+    _contexts = {}
+    _lock = threading.Lock()
+    computed = 0
+    avoided = 0
+
+    def __init__(self, df):
+        self._frame = weakref.ref(df)
+        self._key = None
+        self._values = {}
+
+    @classmethod
+    def of(cls, df):
+        """Contexte du DataFrame, créé au premier appel"""
+        with cls._lock:
+            context = cls._contexts.get(id(df))
+            if context is None or context._frame() is not df:
+                context = cls(df)
+                cls._contexts[id(df)] = context
+                weakref.finalize(df, cls._contexts.pop, id(df), None)
+            return context
+
+    @classmethod
+    def stats(cls):
+        """Nombre d'indicateurs calculés et de recalculs évités"""
+        return {'computed': cls.computed, 'avoided': cls.avoided}
+
+    @staticmethod
+    def _last_candle(df):
+        if df.empty:
+            return (0,)
+        last = df['timestamp'].iloc[-1] if 'timestamp' in df.columns else df.index[-1]
+        return len(df), last, df['close'].iloc[-1]
+
+    def get(self, name, compute):
+        """Valeur de l'indicateur name, calculée par compute(df) si absente"""
+        df = self._frame()
+        key = self._last_candle(df)
+        with self._lock:
+            if key != self._key:
+                self._key, self._values = key, {}
+            elif name in self._values:
+                IndicatorContext.avoided += 1
+                return self._values[name]
+        value = compute(df)
+        with self._lock:
+            self._values[name] = value
+            IndicatorContext.computed += 1
+        return value
+
+    def arrays(self):
+        """Vues NumPy des colonnes OHLCV (voir ohlcv_arrays)"""
+        return self.get('arrays', ohlcv_arrays)
+
+    def patterns(self):
+        """Figures de chandeliers de chaque bougie (voir candlestick_patterns)"""
+        return self.get('patterns', frame_patterns)
+
+    def rsi(self, window=14):
+        """RSI de Wilder (ta)"""
+        return self.get(('rsi', window), lambda df: ta.momentum.rsi(df['close'], window=window))
+
+    def rsi_sma(self, periods=14):
+        """RSI à moyennes simples"""
+        def compute(df):
+            delta = df['close'].diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
+            rs = gain / loss
+            return 100 - (100 / (1 + rs))
+        return self.get(('rsi_sma', periods), compute)
+
+    def ema(self, window):
+        return self.get(('ema', window), lambda df: ta.trend.ema_indicator(df['close'], window=window))
+
+    def macd_diff(self):
+        return self.get('macd_diff', lambda df: ta.trend.macd_diff(df['close']))
+
+    def stoch(self):
+        return self.get('stoch', lambda df: ta.momentum.stoch(df['high'], df['low'], df['close']))
+
+    def adx(self):
+        return self.get('adx', lambda df: ta.trend.adx(df['high'], df['low'], df['close']))
+
+    def volume_sma(self, window=20):
+        return self.get(('volume_sma', window), lambda df: df['volume'].rolling(window=window).mean())
+
+    def volume_levels(self, max_levels=5):
+        """Niveaux du profil de volume (voir volume_levels.price_levels)"""
+        return self.get(('levels', max_levels),
+                        lambda df: price_levels(ohlcv_arrays(df), max_levels=max_levels)[0])
+
 
 class TechnicalAnalysis:
+    """
+    Les méthodes ne modifient ni ne copient le DataFrame reçu : les
+    indicateurs viennent du contexte partagé, les tests portent sur des
+    vues NumPy des colonnes
+    """
     @staticmethod
     def calculate_rsi(df, periods=14):
         """Calcule le RSI"""
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=periods).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=periods).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        return IndicatorContext.of(df).rsi_sma(periods)
 
     @staticmethod
     def calculate_support_resistance(df, window=20):
-        """Calcule les niveaux de support et résistance"""
-        rolling_min = df['low'].rolling(window=window).min()
-        rolling_max = df['high'].rolling(window=window).max()
-        return rolling_min.iloc[-1], rolling_max.iloc[-1]
+        """
+        Calcule les niveaux de support et résistance
+        Plus bas et plus haut des window dernières bougies (NaN si l'historique
+        est plus court, comme rolling) ; seule la fenêtre finale est lue
+        """
+        arrays = IndicatorContext.of(df).arrays()
+        if len(arrays['low']) < window:
+            return np.nan, np.nan
+        return arrays['low'][-window:].min(), arrays['high'][-window:].max()
+
+    @staticmethod
+    def calculate_volume_levels(df, max_levels=5):
+        """
+        Supports et résistances multiples tirés du profil de volume
+        Retourne {'supports': [...], 'resistances': [...]}, niveaux classés par
+        force décroissante ({'price', 'strength', 'volume_share'}) ;
+        mis en cache avec les autres indicateurs du DataFrame (voir
+        volume_levels.LevelCache pour un cache par symbole)
+        """
+        return IndicatorContext.of(df).volume_levels(max_levels)
 
     @staticmethod
     def detect_divergence(price_data, rsi_data, window=14):
-        """Détecte les divergences prix/RSI"""
-        price_peaks = pd.Series(price_data).rolling(window, center=True).apply(
-            lambda x: 1 if x.iloc[len(x)//2] == max(x) else (
-                -1 if x.iloc[len(x)//2] == min(x) else 0
-            )
-        )
-        rsi_peaks = pd.Series(rsi_data).rolling(window, center=True).apply(
-            lambda x: 1 if x.iloc[len(x)//2] == max(x) else (
-                -1 if x.iloc[len(x)//2] == min(x) else 0
-            )
-        )
-        return price_peaks != rsi_peaks
+        """
+        Détecte les divergences prix/RSI
+        Accepte aussi des panels 2-D (symboles × bougies) : retourne alors un tableau
+        """
+        price_peaks = local_extrema(price_data, window)
+        rsi_peaks = local_extrema(rsi_data, window)
+        divergence = price_peaks != rsi_peaks
+        if np.ndim(price_data) == 2:
+            return divergence
+        return pd.Series(divergence, index=pd.Series(price_data).index)
 
     @staticmethod
     def calculate_momentum_score(df):
         """Calcule un score de momentum global"""
         # Calcul des indicateurs
-        df['macd'] = ta.trend.macd_diff(df['close'])
-        df['rsi'] = ta.momentum.rsi(df['close'])
-        df['stoch'] = ta.momentum.stoch(df['high'], df['low'], df['close'])
-        df['adx'] = ta.trend.adx(df['high'], df['low'], df['close'])
+        context = IndicatorContext.of(df)
+        macd = context.macd_diff().to_numpy()
+        rsi = context.rsi().to_numpy()
+        stoch = context.stoch().to_numpy()
+        adx = context.adx().to_numpy()
         
         score = 0
         # Scoring des différents indicateurs
-        if df['macd'].iloc[-1] > 0: score += 1
-        if 40 < df['rsi'].iloc[-1] < 60: score += 1
-        if df['stoch'].iloc[-1] > df['stoch'].iloc[-2]: score += 1
-        if df['adx'].iloc[-1] > 25: score += 1
+        if macd[-1] > 0: score += 1
+        if 40 < rsi[-1] < 60: score += 1
+        if stoch[-1] > stoch[-2]: score += 1
+        if adx[-1] > 25: score += 1
         
         return score / 4
 
@@ -59,44 +189,43 @@ class TechnicalAnalysis:
         sentiment_score = 0
         
         # Analyse des EMA
-        df['ema9'] = ta.trend.ema_indicator(df['close'], window=9)
-        df['ema20'] = ta.trend.ema_indicator(df['close'], window=20)
-        df['ema50'] = ta.trend.ema_indicator(df['close'], window=50)
+        context = IndicatorContext.of(df)
+        close = context.arrays()['close']
+        ema9 = context.ema(9).to_numpy()
+        ema20 = context.ema(20).to_numpy()
+        ema50 = context.ema(50).to_numpy()
         
-        if df['ema9'].iloc[-1] > df['ema20'].iloc[-1]: sentiment_score += 1
-        if df['ema20'].iloc[-1] > df['ema50'].iloc[-1]: sentiment_score += 1
-        if df['close'].iloc[-1] > df['ema20'].iloc[-1]: sentiment_score += 1
+        if ema9[-1] > ema20[-1]: sentiment_score += 1
+        if ema20[-1] > ema50[-1]: sentiment_score += 1
+        if close[-1] > ema20[-1]: sentiment_score += 1
         
         return sentiment_score / 3
 
     @staticmethod
     def analyze_volume_profile(df):
         """Analyse le profil volumétrique"""
-        volume_mean = df['volume'].mean()
-        recent_volume = df['volume'].iloc[-5:].mean()
-        return recent_volume / volume_mean
+        context = IndicatorContext.of(df)
+        def compute(df):
+            volume = context.arrays()['volume']
+            return np.nanmean(volume[-5:]) / np.nanmean(volume)
+        return context.get('volume_profile', compute)
 
     @staticmethod
     def detect_trend_reversal(df):
-        """Détecte les potentiels retournements de tendance"""
-        signals = []
-        
-        # Patterns de chandeliers
-        df['doji'] = ta.candlestick.doji(df['open'], df['high'], df['low'], df['close'])
-        df['hammer'] = ta.candlestick.hammer(df['open'], df['high'], df['low'], df['close'])
-        df['shooting_star'] = ta.candlestick.shooting_star(df['open'], df['high'], df['low'], df['close'])
-        
-        if df['doji'].iloc[-1]: signals.append("Doji")
-        if df['hammer'].iloc[-1]: signals.append("Hammer")
-        if df['shooting_star'].iloc[-1]: signals.append("Shooting Star")
-        
-        return signals
+        """
+        Détecte les potentiels retournements de tendance
+        Retourne les libellés des figures de chandeliers de la dernière bougie
+        """
+        # Patterns de chandeliers, évalués sur toutes les bougies en une passe
+        patterns = IndicatorContext.of(df).patterns()
+        return [PATTERNS[name][0] for name, hits in patterns.items() if hits[-1]]
 
 class SignalGenerator:
     def __init__(self, df, current_price):
         self.df = df
         self.current_price = current_price
         self.ta = TechnicalAnalysis()
+        self.context = IndicatorContext.of(df)
 
     def generate_trading_signals(self):
         """
@@ -113,21 +242,22 @@ class SignalGenerator:
         }
 
         # Calcul des indicateurs
-        rsi = self.ta.calculate_rsi(self.df).iloc[-1]
-        macd = ta.trend.macd_diff(self.df['close'])
+        rsi = self.context.rsi_sma().to_numpy()[-1]
+        macd = self.context.macd_diff().to_numpy()
         volume_trend = self.ta.analyze_volume_profile(self.df)
+        close = self.context.arrays()['close']
         
         # Conditions d'achat
         buy_conditions = (
             30 <= rsi <= 40 and
-            macd.iloc[-1] > macd.iloc[-2] and
+            macd[-1] > macd[-2] and
             volume_trend > 1
         )
         
         # Conditions de vente
         sell_conditions = (
             rsi >= 70 or
-            (macd.iloc[-1] < macd.iloc[-2] and self.current_price >= self.df['close'].mean())
+            (macd[-1] < macd[-2] and self.current_price >= close.mean())
         )
 
         if buy_conditions:
@@ -138,43 +268,48 @@ class SignalGenerator:
                 'stop_loss': self.current_price * 0.99,
                 'target_1': self.current_price * 1.02,
                 'target_2': self.current_price * 1.03,
-                'reasons': [
-                    "RSI en zone de survente",
-                    "MACD en reprise",
-                    "Volume confirmant"
-                ]
+                'reasons': self.signal_reasons('BUY', rsi)
             })
         elif sell_conditions:
             signals.update({
                 'action': 'SELL',
                 'strength': min((rsi - 70) / 10 * 0.5 + volume_trend * 0.5, 1),
-                'reasons': [
-                    "RSI en zone de surachat" if rsi >= 70 else "Objectif atteint",
-                    "MACD baissier",
-                    "Volume significatif"
-                ]
+                'reasons': self.signal_reasons('SELL', rsi)
             })
 
         return signals
 
+    @staticmethod
+    def signal_reasons(action, rsi):
+        """Raisons affichées pour un signal ('BUY', 'SELL' ou None)"""
+        if action == 'BUY':
+            return ["RSI en zone de survente", "MACD en reprise", "Volume confirmant"]
+        if action == 'SELL':
+            return [
+                "RSI en zone de surachat" if rsi >= 70 else "Objectif atteint",
+                "MACD baissier",
+                "Volume significatif"
+            ]
+        return []
+
     def calculate_opportunity_score(self):
         """
         Calcule un score global pour l'opportunité
         """
         # Prix actuel en tendance haussière par rapport aux EMAs ?
-        df = self.df.copy()
-        df['ema9'] = ta.trend.ema_indicator(df['close'], window=9)
-        df['ema20'] = ta.trend.ema_indicator(df['close'], window=20)
-        df['ema50'] = ta.trend.ema_indicator(df['close'], window=50)
+        arrays = self.context.arrays()
+        close, volume = arrays['close'], arrays['volume']
+        ema9 = self.context.ema(9).to_numpy()
+        ema20 = self.context.ema(20).to_numpy()
         
         trend_score = 0
-        if df['close'].iloc[-1] > df['ema9'].iloc[-1] > df['ema20'].iloc[-1]:
+        if close[-1] > ema9[-1] > ema20[-1]:
             trend_score = 0.4
-        elif df['close'].iloc[-1] > df['ema20'].iloc[-1]:
+        elif close[-1] > ema20[-1]:
             trend_score = 0.2
             
         # RSI dans une zone intéressante ?
-        rsi = ta.momentum.rsi(df['close']).iloc[-1]
+        rsi = self.context.rsi().to_numpy()[-1]
         rsi_score = 0
         if 30 <= rsi <= 40:  # Zone de survente
             rsi_score = 0.3
@@ -182,14 +317,121 @@ class SignalGenerator:
             rsi_score = 0.2
             
         # Volume significatif ?
-        volume_sma = df['volume'].rolling(window=20).mean().iloc[-1]
+        volume_sma = self.context.volume_sma(20).to_numpy()[-1]
         volume_score = 0
-        if df['volume'].iloc[-1] > volume_sma * 1.5:
+        if volume[-1] > volume_sma * 1.5:
             volume_score = 0.3
-        elif df['volume'].iloc[-1] > volume_sma:
+        elif volume[-1] > volume_sma:
             volume_score = 0.2
             
         # Score final
         final_score = trend_score + rsi_score + volume_score
         
         return min(final_score, 1.0)  # Score maximum de 1.0
+
+    @staticmethod
+    def batch_opportunity_scores(panel, indicators=None):
+        """
+        Version vectorisée de calculate_opportunity_score
+        panel : dict de tableaux 2-D (symboles × bougies), voir panel_indicators.build_panel
+        Retourne un tableau de scores, un par symbole
+        """
+        close, volume = panel['close'], panel['volume']
+        if indicators is None:
+            indicators = compute_panel_indicators(close, panel['high'], panel['low'], volume)
+
+        last_close = close[:, -1]
+        ema9 = indicators['ema9'][:, -1]
+        ema20 = indicators['ema20'][:, -1]
+        trend_score = np.select(
+            [(last_close > ema9) & (ema9 > ema20), last_close > ema20], [0.4, 0.2], 0.0
+        )
+
+        rsi = indicators['rsi'][:, -1]
+        rsi_score = np.select(
+            [(rsi >= 30) & (rsi <= 40), (rsi > 40) & (rsi <= 60)], [0.3, 0.2], 0.0
+        )
+
+        last_volume = volume[:, -1]
+        volume_sma = indicators['volume_sma'][:, -1]
+        volume_score = np.select(
+            [last_volume > volume_sma * 1.5, last_volume > volume_sma], [0.3, 0.2], 0.0
+        )
+
+        return np.minimum(trend_score + rsi_score + volume_score, 1.0)
+
+    @staticmethod
+    def batch_trading_signals(panel, current_prices, indicators=None):
+        """
+        Version vectorisée de generate_trading_signals
+        Retourne un dict de tableaux (un élément par symbole) ;
+        action vaut 'BUY', 'SELL' ou None, reasons est une liste par symbole
+        """
+        close, volume = panel['close'], panel['volume']
+        if indicators is None:
+            indicators = compute_panel_indicators(close, panel['high'], panel['low'], volume)
+        current_prices = np.asarray(current_prices, dtype=float)
+
+        rsi = indicators['rsi_sma'][:, -1]
+        macd = indicators['macd_diff']
+        macd_rising = macd[:, -1] > macd[:, -2]
+        macd_falling = macd[:, -1] < macd[:, -2]
+        volume_trend = volume[:, -5:].mean(axis=1) / volume.mean(axis=1)
+
+        buy = (rsi >= 30) & (rsi <= 40) & macd_rising & (volume_trend > 1)
+        sell = ~buy & ((rsi >= 70) | (macd_falling & (current_prices >= close.mean(axis=1))))
+
+        action = np.full(len(rsi), None, dtype=object)
+        action[buy] = 'BUY'
+        action[sell] = 'SELL'
+
+        strength = np.zeros(len(rsi))
+        strength[buy] = np.minimum((40 - rsi[buy]) / 10 * 0.5 + volume_trend[buy] * 0.5, 1)
+        strength[sell] = np.minimum((rsi[sell] - 70) / 10 * 0.5 + volume_trend[sell] * 0.5, 1)
+
+        def buy_level(factor):
+            return np.where(buy, current_prices * factor, np.nan)
+
+        return {
+            'action': action,
+            'strength': strength,
+            'entry_price': buy_level(1.0),
+            'stop_loss': buy_level(0.99),
+            'target_1': buy_level(1.02),
+            'target_2': buy_level(1.03),
+            'reasons': [SignalGenerator.signal_reasons(a, r) for a, r in zip(action, rsi)]
+        }
+
+    @staticmethod
+    def batch_evaluate(frames, current_prices, length=100):
+        """
+        Score et signaux de plusieurs symboles
+        frames : {symbole: DataFrame OHLCV} ; current_prices : {symbole: prix}
+        Les séries d'au moins length bougies sont évaluées en une passe sur le
+        panel, les plus courtes (symboles récemment listés) une par une
+        Retourne {symbole: (score, signaux)}, signaux au format de
+        generate_trading_signals
+        """
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        symbols, panel = build_panel({s: df for s, df in frames.items() if len(df) >= length}, length)
+
+        results = {}
+        if symbols:
+            indicators = compute_panel_indicators(panel['close'], panel['high'], panel['low'], panel['volume'])
+            scores = SignalGenerator.batch_opportunity_scores(panel, indicators)
+            signals = SignalGenerator.batch_trading_signals(
+                panel, [current_prices[s] for s in symbols], indicators)
+            for i, symbol in enumerate(symbols):
+                row = {key: values[i] for key, values in signals.items()}
+                # Mêmes valeurs que la version scalaire : None hors signal d'achat
+                for key in ('entry_price', 'stop_loss', 'target_1', 'target_2'):
+                    row[key] = None if np.isnan(row[key]) else float(row[key])
+                row['strength'] = float(row['strength'])
+                results[symbol] = (float(scores[i]), row)
+
+        for symbol, df in frames.items():
+            if symbol not in results:
+                generator = SignalGenerator(df, current_prices[symbol])
+                results[symbol] = (generator.calculate_opportunity_score(),
+                                   generator.generate_trading_signals())
+        return results
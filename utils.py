@@ -5,6 +5,11 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import time
+import sqlite3
+from rate_limiter import RateLimitedExchange
+from ohlcv_store import get_ohlcv_store
+from candle_cache import get_candle_cache
+from symbol_index import get_symbol_index, restore_markets
 
 class SessionState:
     """
@@ -56,54 +61,72 @@ class SessionState:
 def get_exchange():
     """
     Initialise et retourne l'objet exchange
+    Tous les appels passent par un token bucket partagé par les pages
+    Les marchés sont relus depuis l'instantané disque : pas de
+    load_markets bloquant au démarrage (voir symbol_index.py)
     """
-    return ccxt.kucoin({
+    exchange = ccxt.kucoin({
         'adjustForTimeDifference': True,
         'timeout': 30000,
+        'enableRateLimit': False,  # Remplacé par RateLimitedExchange
     })
+    exchange = RateLimitedExchange(exchange)
+    restore_markets(exchange)
+    return exchange
 
 def get_valid_symbol(_exchange, symbol):
     """
     Vérifie et formate le symbole pour l'exchange
+    Recherche en temps constant dans l'index des symboles (symbol_index.py)
     """
     try:
         if not symbol:
             return None
-            
-        symbol = symbol.upper().strip()
-        markets = _exchange.load_markets()
-        
-        possible_pairs = [
-            f"{symbol}/USDT",
-            f"{symbol}/USDT:USDT",
-            f"{symbol}USDT"
-        ]
-        
-        for pair in possible_pairs:
-            if pair in markets:
-                return pair
-                
-        return None
+        return get_symbol_index(_exchange).resolve(symbol)
         
     except Exception as e:
         st.error(f"Erreur lors de la vérification du symbole: {str(e)}")
         return None
     
-@st.cache_data(ttl=300)  # Cache de 5 minutes
 def calculate_timeframe_data(_exchange, symbol, timeframe='1h', limit=100):
     """
     Récupère et calcule les données pour un timeframe donné
-    Note: Le préfixe _ sur _exchange empêche Streamlit de hasher cet argument
+    Bougies clôturées en cache jusqu'à la prochaine clôture, bougie en
+    cours rafraîchie régulièrement (voir candle_cache.py)
     """
     try:
-        ohlcv = _exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
-        df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
+        return fetch_ohlcv_dataframe(_exchange, symbol, timeframe, limit)
     except Exception as e:
         st.error(f"Erreur lors du calcul des données {timeframe}: {str(e)}")
         return None
 
+def fetch_ohlcv_dataframe(exchange, symbol, timeframe='1h', limit=100):
+    """
+    Récupère les bougies OHLCV sous forme de DataFrame
+    Sans cache ni affichage Streamlit : utilisable depuis un thread
+    Seules les bougies absentes du stockage local sont téléchargées
+    """
+    return get_candle_cache().get_or_fetch(
+        symbol, timeframe, limit,
+        lambda: _load_ohlcv(exchange, symbol, timeframe, limit),
+        # Rafraîchissement de la bougie en cours : une seule bougie téléchargée
+        lambda: _load_ohlcv(exchange, symbol, timeframe, 2)
+    )
+
+def _load_ohlcv(exchange, symbol, timeframe, limit):
+    """
+    Lit les bougies via le stockage local, téléchargement direct en secours
+    """
+    try:
+        return get_ohlcv_store().get_ohlcv(exchange, symbol, timeframe, limit)
+    except sqlite3.Error as e:
+        print(f"Stockage local indisponible ({str(e)}), téléchargement direct")
+
+    ohlcv = exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+    df = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    return df
+
 # Dans utils.py
 def format_number(number, decimals=8):
     """
@@ -0,0 +1,179 @@
+# volume_levels.py
+import threading
+import numpy as np
+
+# Supports et résistances déduits du volume échangé à chaque prix
+# (profil de volume). Comme panel_indicators, les calculs travaillent sur des
+# panels 2-D (symboles × bougies) ; les séries de longueurs différentes sont
+# complétées par des NaN en tête, ignorés.
+
+# Nombre de tranches de prix du profil
+DEFAULT_BINS = 100
+# Écart relatif en dessous duquel deux niveaux sont fusionnés
+MERGE_TOLERANCE = 0.01
+
+
+def stack_series(frames, columns=('high', 'low', 'close', 'volume')):
+    """
+    Empile les colonnes d'un dict {symbole: DataFrame} en tableaux 2-D
+    Contrairement à panel_indicators.build_panel, tout l'historique de
+    chaque symbole est conservé (NaN en tête des séries plus courtes)
+    """
+    frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+    symbols = list(frames)
+    length = max((len(df) for df in frames.values()), default=0)
+    panel = {}
+    for column in columns:
+        values = np.full((len(symbols), length), np.nan)
+        for row, symbol in enumerate(symbols):
+            series = frames[symbol][column].to_numpy(dtype=float)
+            values[row, length - len(series):] = series
+        panel[column] = values
+    return symbols, panel
+
+
+def volume_profile(high, low, close, volume, bins=DEFAULT_BINS):
+    """
+    Volume échangé par tranche de prix, pour chaque ligne du panel
+    Le volume d'une bougie est attribué à son prix typique (H+L+C)/3 ;
+    les tranches couvrent le plus bas / plus haut de chaque ligne
+    Retourne (centres des tranches, volumes), deux tableaux (lignes × bins)
+    """
+    high, low, close, volume = (np.atleast_2d(np.asarray(x, dtype=float))
+                                for x in (high, low, close, volume))
+    rows = high.shape[0]
+    typical = (high + low + close) / 3
+
+    with np.errstate(invalid='ignore'):
+        bottom = np.nanmin(low, axis=1, keepdims=True)
+        top = np.nanmax(high, axis=1, keepdims=True)
+        width = np.where(top > bottom, top - bottom, 0.0)
+        # Position dans [0, 1) de chaque prix au sein de sa ligne (0 si le
+        # prix n'a pas varié)
+        position = np.clip((typical - bottom) / np.where(width > 0, width, 1.0),
+                           0, np.nextafter(1, 0))
+
+    # Un seul histogramme pour tout le panel : la ligne r occupe les
+    # tranches [r * bins, (r + 1) * bins)
+    valid = ~np.isnan(position) & ~np.isnan(volume)
+    index = (np.where(valid, position, 0) * bins).astype(np.int64) + np.arange(rows)[:, None] * bins
+    counts = np.bincount(index[valid], weights=volume[valid], minlength=rows * bins)
+
+    centers = bottom + width * (np.arange(bins) + 0.5) / bins
+    return centers, counts.reshape(rows, bins)
+
+
+def _cluster_peaks(centers, volumes, tolerance):
+    """
+    Regroupe les pics du profil distants de moins de tolerance (relatif)
+    Retourne (ligne, prix pondéré par le volume, poids, volume) de chaque
+    niveau : le poids vient du profil lissé, le volume des seules tranches
+    des pics (les parts de volume des niveaux d'une ligne somment à 1 au plus)
+    """
+    # Volume de chaque tranche et de ses deux voisines : lissage avant la
+    # recherche de pics, sert aussi de poids au niveau
+    padded = np.pad(volumes, ((0, 0), (1, 1)))
+    smooth = padded[:, :-2] + padded[:, 1:-1] + padded[:, 2:]
+    left = np.pad(smooth, ((0, 0), (1, 0)))[:, :-1]
+    right = np.pad(smooth, ((0, 0), (0, 1)))[:, 1:]
+    rows, bins = np.nonzero((smooth > left) & (smooth >= right) & (volumes > 0))
+    if not len(rows):
+        return rows, np.empty(0), np.empty(0), np.empty(0)
+
+    # Les pics sont triés par ligne puis par prix : un nouveau groupe démarre
+    # à chaque changement de ligne ou écart de prix supérieur à la tolérance
+    prices = centers[rows, bins]
+    weights = smooth[rows, bins]
+    gap = np.diff(prices, prepend=np.nan) > np.abs(prices) * tolerance
+    new_group = np.r_[True, rows[1:] != rows[:-1]] | gap
+    groups = np.cumsum(new_group) - 1
+
+    weight = np.bincount(groups, weights=weights)
+    price = np.bincount(groups, weights=weights * prices) / weight
+    volume = np.bincount(groups, weights=volumes[rows, bins])
+    return rows[new_group], price, weight, volume
+
+
+def price_levels(panel, current_prices=None, bins=DEFAULT_BINS, tolerance=MERGE_TOLERANCE,
+                 max_levels=5):
+    """
+    Niveaux de support et de résistance de chaque ligne du panel
+    Les pics du profil de volume sont regroupés, puis classés par force :
+    volume lissé du niveau rapporté à celui du niveau le plus fort de la
+    ligne (0-1) ; volume_share est la part du volume total échangée aux pics
+    du niveau
+    Sans current_prices, la dernière clôture de chaque ligne sert de référence
+    Retourne une liste (par ligne) de {'supports': [...], 'resistances': [...]},
+    chaque niveau étant {'price', 'strength', 'volume_share'}
+    """
+    close = np.atleast_2d(np.asarray(panel['close'], dtype=float))
+    current_prices = close[:, -1] if current_prices is None else np.asarray(current_prices, dtype=float)
+
+    centers, volumes = volume_profile(panel['high'], panel['low'], close, panel['volume'], bins)
+    rows, prices, level_weights, level_volumes = _cluster_peaks(centers, volumes, tolerance)
+
+    totals = volumes.sum(axis=1)
+    strongest = np.zeros(len(close))
+    np.maximum.at(strongest, rows, level_weights)
+
+    results = [{'supports': [], 'resistances': []} for _ in range(len(close))]
+    for i in np.argsort(-level_weights, kind='stable'):
+        row = rows[i]
+        side = 'supports' if prices[i] <= current_prices[row] else 'resistances'
+        if len(results[row][side]) < max_levels:
+            results[row][side].append({
+                'price': float(prices[i]),
+                'strength': float(level_weights[i] / strongest[row]),
+                'volume_share': float(level_volumes[i] / totals[row])
+            })
+    return results
+
+
+class LevelCache:
+    """
+    Niveaux par symbole, recalculés seulement à la clôture d'une nouvelle bougie
+    Les symboles à recalculer sont traités ensemble, en un seul panel
+    """
+    def __init__(self, bins=DEFAULT_BINS, tolerance=MERGE_TOLERANCE, max_levels=5):
+        self.bins = bins
+        self.tolerance = tolerance
+        self.max_levels = max_levels
+        self._levels = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _last_candle(df):
+        return len(df), df['timestamp'].iloc[-1], df['close'].iloc[-1]
+
+    def get_levels(self, frames):
+        """
+        Niveaux de chaque série de frames ({clé: DataFrame OHLCV})
+        La clé identifie la série : symbole, ou (symbole, timeframe) si
+        plusieurs timeframes d'un même symbole sont suivis
+        Retourne {clé: {'supports': [...], 'resistances': [...]}}
+        """
+        frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+        keys = {symbol: self._last_candle(df) for symbol, df in frames.items()}
+        with self._lock:
+            cached = {s: self._levels.get(s) for s in frames}
+        stale = {s: frames[s] for s, entry in cached.items() if entry is None or entry[0] != keys[s]}
+
+        if stale:
+            symbols, panel = stack_series(stale)
+            computed = price_levels(panel, bins=self.bins, tolerance=self.tolerance,
+                                    max_levels=self.max_levels)
+            with self._lock:
+                for symbol, levels in zip(symbols, computed):
+                    self._levels[symbol] = (keys[symbol], levels)
+                    cached[symbol] = (keys[symbol], levels)
+        return {symbol: entry[1] for symbol, entry in cached.items()}
+
+
+_default_cache = LevelCache()
+
+
+def get_level_cache():
+    """
+    Retourne le cache de niveaux partagé par toute l'application
+    """
+    return _default_cache